@@ -3,8 +3,14 @@ Epic Changelog Agent Package
 A theatrical changelog generator that transforms mundane updates into epic narratives.
 """
 
-from .epic_log_generator import EpicChangelogAgent
-
 __version__ = "1.0.0"
 __author__ = "Epic Changelog Team"
-__all__ = ["EpicChangelogAgent"]
\ No newline at end of file
+__all__ = ["EpicChangelogAgent"]
+
+
+def __getattr__(name):
+    # Imported on first use so the CLI can start without loading google-genai
+    if name == "EpicChangelogAgent":
+        from .epic_log_generator import EpicChangelogAgent
+        return EpicChangelogAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
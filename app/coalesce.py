@@ -0,0 +1,34 @@
+"""Request coalescing for Epic Changelog Agent."""
+
+import hashlib
+from typing import Callable, Dict, Optional
+
+
+class Coalescer:
+    """Shares one generation between duplicate changelog entries within a run."""
+
+    def __init__(self, call_fn: Callable[[str, int, str], str],
+                 is_failure: Optional[Callable[[str], bool]] = None):
+        """Wrap a generation function taking (entry, drama_level, theme).
+
+        Results for which is_failure returns True are passed through but not
+        remembered, so a repeated entry gets a fresh attempt.
+        """
+        self._call_fn = call_fn
+        self._is_failure = is_failure
+        self._results: Dict[str, str] = {}
+
+    @staticmethod
+    def make_key(entry: str, drama_level: int, theme: str) -> str:
+        """Build the coalescing key for a request."""
+        return hashlib.sha256(f"{drama_level}|{theme}|{entry}".encode("utf-8")).hexdigest()
+
+    def get(self, entry: str, drama_level: int, theme: str) -> str:
+        """Get the transformation for an entry, generating it only the first time."""
+        key = self.make_key(entry, drama_level, theme)
+        if key in self._results:
+            return self._results[key]
+        result = self._call_fn(entry, drama_level, theme)
+        if self._is_failure is None or not self._is_failure(result):
+            self._results[key] = result
+        return result
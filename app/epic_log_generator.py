@@ -4,23 +4,202 @@ A theatrical changelog generator that transforms mundane updates into epic narra
 """
 
 import os
-from typing import List, Optional, Dict
+import re
+import json
+import asyncio
+import functools
+import contextlib
+import contextvars
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Mapping, Optional, Dict, Tuple
 from dotenv import load_dotenv
 from colorama import Fore, Style
 from google import genai
-from google.genai import types
+from google.genai import client as genai_client, types
 from .theme_loader import ThemeLoader
+from .response_cache import ResponseCache, default_cache_dir
+from .rate_limit import AdaptiveLimiter, is_retryable, retry_async
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Start of every result that stands in for a failed transformation
+FAILURE_PREFIX = "⚠️ Failed to summon the epic transformation"
+
+# Upper bound on in-flight Gemini requests when processing a changelog file
+DEFAULT_MAX_CONCURRENCY = 16
+
+# Per-request HTTP timeout for Gemini calls, in milliseconds
+REQUEST_TIMEOUT_MS = 30_000
+
+# Output token budget for one 7-10 word tale
+MAX_OUTPUT_TOKENS = 48
+
+# Models that always think; thinking tokens count against max_output_tokens,
+# so a short-tale cap would leave them no room for the answer
+_ALWAYS_THINKING_MODELS = ("2.5-pro", "gemini-3")
+
+# Streamed responses are cut off once they reach this many words
+MAX_TALE_WORDS = 15
+
+# Entries read and dispatched together when streaming a changelog file
+FILE_WINDOW_SIZE = 32
+
+# Read buffer for changelog files
+FILE_BUFFER_SIZE = 1 << 20
+
+# Batch API job states whose output file can be downloaded
+_BATCH_DONE_STATES = ("JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED")
+
+# Changelog entries packed into a single prompt when processing a file
+DEFAULT_BATCH_SIZE = 10
+
+# Batched responses are returned as a JSON array of {emoji, epic} objects
+_BATCH_RESPONSE_SCHEMA = types.Schema(
+    type=types.Type.ARRAY,
+    items=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "emoji": types.Schema(type=types.Type.STRING),
+            "epic": types.Schema(type=types.Type.STRING),
+        },
+        required=["emoji", "epic"],
+    ),
+)
+
+# User prompt templates
+_USER_TEMPLATE = "Transform this software change into an epic {theme} tale: '{text}'"
+_BATCH_USER_TEMPLATE = ("Transform each numbered software change into a distinct epic {theme} tale. "
+                        "Return exactly {count} items, in the same order:\n{numbered}")
+
+# Emojis that mark a response as already decorated
+_EPIC_EMOJIS = ('⚔️', '🏰', '🐉', '🚀', '💥', '⚡', '🎭', '🤖', '🏴‍☠️', '🤠')
+_EPIC_EMOJI_RE = re.compile("|".join(map(re.escape, _EPIC_EMOJIS)))
+
+# Drama instructions indexed by drama level (0-10)
+_DRAMA_INSTRUCTIONS = (
+    ("Use subtle epic language with moderate excitement.",) * 4
+    + ("Use dramatic language with strong action words and vivid imagery.",) * 3
+    + ("Use highly dramatic language with intense action, multiple adjectives, and epic stakes.",) * 2
+    + ("Use MAXIMUM DRAMA with over-the-top language, legendary consequences, and world-shaking events!",) * 2
+)
+
+# Concurrency limiter of the file currently being processed, shared by its request tasks.
+# Stored with the API key it limits, so agents using other keys never share it.
+_ACTIVE_LIMITER: "contextvars.ContextVar[Optional[Tuple[str, AdaptiveLimiter]]]" = contextvars.ContextVar(
+    "_ACTIVE_LIMITER", default=None)
+
+# Async Gemini client of the current run, shared by its request tasks.
+# Stored with its API key, so agents using other keys never send requests through it.
+_ACTIVE_AIO: "contextvars.ContextVar[Optional[Tuple[str, genai_client.AsyncClient]]]" = contextvars.ContextVar(
+    "_ACTIVE_AIO", default=None)
+
+_ENV_LOADED = False
+
+
+def _load_env_once() -> None:
+    """Load environment variables from .env the first time an agent is created."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        load_dotenv()
+        _ENV_LOADED = True
+
+
+def _new_genai_client(api_key: str) -> genai.Client:
+    """Create a Gemini client with the agent's request timeout."""
+    return genai.Client(api_key=api_key, http_options=types.HttpOptions(timeout=REQUEST_TIMEOUT_MS))
+
+
+@functools.lru_cache(maxsize=8)
+def _get_genai_client(api_key: str) -> genai.Client:
+    """Get a Gemini client for an API key, shared by every agent using that key.
+
+    Only its sync side is shared: the sync connection pool lives for the
+    whole process, so repeated requests skip connection setup. Async pooled
+    connections are bound to the event loop that opened them, so async
+    requests go through a client created and closed per run instead (see
+    _with_async_client).
+    """
+    return _new_genai_client(api_key)
+
+
+def _with_async_client(method):
+    """Run an async agent method with the async Gemini client of the current run.
+
+    The outermost call creates the client and closes it when it returns;
+    nested calls with the same API key and the tasks they spawn reuse it
+    through _ACTIVE_AIO.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with self._async_client_scope():
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+def _truncate_words(text: str) -> str:
+    """Trim text to at most MAX_TALE_WORDS words."""
+    words = text.split()
+    if len(words) <= MAX_TALE_WORDS:
+        return text
+    return " ".join(words[:MAX_TALE_WORDS])
+
+
+def _add_tale_chunk(text: str, chunk) -> Tuple[str, bool]:
+    """Append a streamed response chunk to a tale.
+
+    Also returns whether the tale has reached MAX_TALE_WORDS, in which case
+    the rest of the stream need not be read.
+    """
+    text += chunk.text or ""
+    return text, len(text.split()) >= MAX_TALE_WORDS
+
+
+def _iter_changelog_entries(filename: str) -> Iterator[str]:
+    """Yield the non-empty, stripped lines of a changelog file one at a time."""
+    with open(filename, 'r', encoding='utf-8', buffering=FILE_BUFFER_SIZE) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def _iter_changelog_windows(filename: str) -> Iterator[List[str]]:
+    """Yield the entries of a changelog file in lists of up to FILE_WINDOW_SIZE."""
+    window: List[str] = []
+    for entry in _iter_changelog_entries(filename):
+        window.append(entry)
+        if len(window) == FILE_WINDOW_SIZE:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def _read_changelog_entries(filename: str) -> List[str]:
+    """Read all non-empty, stripped lines of a changelog file."""
+    return [entry for line in Path(filename).read_text(encoding='utf-8').splitlines() if (entry := line.strip())]
 
-# Load environment variables
-load_dotenv()
 
 class EpicChangelogAgent:
     """Module for epic changelogs generation."""
 
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None, custom_themes_dir: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None, custom_themes_dir: Optional[str] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, use_cache: bool = True,
+                 cache_dir: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE):
         """Initialize the agent with Google API key and load themes."""
+        _load_env_once()
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self.model = model or os.getenv("DEFAULT_MODEL")
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+
+        # System prompts memoized per (theme, drama_level)
+        self._system_messages: Dict[Tuple[str, int], str] = {}
         
         # Load themes from JSON files using ThemeLoader
         try:
@@ -29,12 +208,12 @@ class EpicChangelogAgent:
         except Exception as e:
             print(f"{Fore.RED}⚠️ Failed to load themes: {e}{Style.RESET_ALL}")
             raise
-        
+
         # API setup
         self.use_api = True
         if self.api_key:
             try:
-                self.client = genai.Client(api_key=self.api_key)
+                self.client = _get_genai_client(self.api_key)
                 print(f"{Fore.GREEN}🤗 Using Google Generative AI{Style.RESET_ALL}")
             except Exception as e:
                 print(f"{Fore.YELLOW}⚠️ API setup failed: {e}{Style.RESET_ALL}")
@@ -45,6 +224,22 @@ class EpicChangelogAgent:
         if not self.use_api:
             raise ValueError("GOOGLE_API_KEY is required. Set GOOGLE_API_KEY in environment or .env file")
 
+        # Manifests of submitted Gemini batch jobs, needed to pair results with entries
+        self.batch_dir = (Path(cache_dir) if cache_dir else default_cache_dir()) / "batches"
+
+        # Persistent cache of generated responses, opened only once the agent is usable
+        self._cache = None
+        if use_cache:
+            try:
+                self._cache = ResponseCache(cache_dir)
+            except Exception as e:
+                print(f"{Fore.YELLOW}⚠️ Response cache unavailable: {e}{Style.RESET_ALL}")
+
+    @property
+    def themes(self) -> Mapping[str, Dict]:
+        """Read-only view of the loaded themes, shared with the theme loader."""
+        return self.theme_loader.get_all_themes()
+
     def get_available_themes(self) -> List[str]:
         """Get list of available theme names."""
         return self.theme_loader.get_available_themes()
@@ -59,82 +254,525 @@ class EpicChangelogAgent:
     
     def add_custom_theme(self, theme_file_path: str, permanent: bool = False) -> bool:
         """Add a custom theme from JSON file."""
-        return self.theme_loader.add_custom_theme(theme_file_path, permanent)
+        added = self.theme_loader.add_custom_theme(theme_file_path, permanent)
+        if added:
+            # The new theme may replace one we already built prompts for
+            self._system_messages.clear()
+        return added
 
     def create_custom_theme_template(self, theme_name: str = "my_theme") -> bool:
         """Create a template for a new custom theme."""
         return self.theme_loader.create_custom_theme_template(theme_name)
+
+    def clear_cache(self) -> None:
+        """Remove all cached epic transformations."""
+        if self._cache is not None:
+            self._cache.clear()
+
+    @contextlib.asynccontextmanager
+    async def _async_client_scope(self) -> AsyncIterator[None]:
+        """Provide an async Gemini client for this run unless one for this API key is already active."""
+        if self._run_aio() is not None:
+            yield
+            return
+
+        run_client = _new_genai_client(self.api_key)
+        aio_token = _ACTIVE_AIO.set((self.api_key, run_client.aio))
+        try:
+            yield
+        finally:
+            _ACTIVE_AIO.reset(aio_token)
+            await run_client.aio.aclose()
+            run_client.close()
+
+    def _run_aio(self) -> Optional[genai_client.AsyncClient]:
+        """Get the async Gemini client of the current run, if it belongs to this agent's API key."""
+        active = _ACTIVE_AIO.get()
+        return active[1] if active is not None and active[0] == self.api_key else None
+
+    def _run_limiter(self) -> Optional[AdaptiveLimiter]:
+        """Get the concurrency limiter of the current run, if it limits this agent's API key."""
+        active = _ACTIVE_LIMITER.get()
+        return active[1] if active is not None and active[0] == self.api_key else None
+
     def _get_drama_instructions(self, drama_level: int) -> str:
         """Generate drama-specific instructions based on level."""
-        if drama_level <= 3:
-            return "Use subtle epic language with moderate excitement."
-        elif drama_level <= 6:
-            return "Use dramatic language with strong action words and vivid imagery."
-        elif drama_level <= 8:
-            return "Use highly dramatic language with intense action, multiple adjectives, and epic stakes."
-        else:
-            return "Use MAXIMUM DRAMA with over-the-top language, legendary consequences, and world-shaking events!"
-    
-    def generate_epic_changelog(self, original_text: str, drama_level: int = 7, theme: str = "medieval") -> str:
-        """Transform a boring changelog entry into an epic narrative."""
-        
+        return _DRAMA_INSTRUCTIONS[min(max(drama_level, 0), 10)]
+
+    def _get_system_message(self, theme: str, theme_data: Dict, drama_level: int) -> str:
+        """Get the system prompt for a theme and drama level, building it on first use."""
+        system_message = self._system_messages.get((theme, drama_level))
+        if system_message is None:
+            theme_vocabulary = ", ".join(theme_data["vocabulary"][:8])
+            theme_metaphors = ", ".join(theme_data["metaphors"][:6])
+            drama_instructions = self._get_drama_instructions(drama_level)
+
+            system_message = (
+                f"You are a creative storyteller specializing in {theme_data['tone']} narratives. "
+                f"Transform software changes into epic {theme} stories using this vocabulary: {theme_vocabulary}. "
+                f"Include metaphors like: {theme_metaphors}. {drama_instructions} "
+                "Keep responses to 7-10 words with an appropriate emoji. Be direct and dramatic."
+            )
+            self._system_messages[(theme, drama_level)] = system_message
+
+        return system_message
+
+    def _generation_config(self, system_message: str, max_output_tokens: int,
+                           stop_sequences: Optional[List[str]] = None,
+                           response_schema: Optional[types.Schema] = None) -> types.GenerateContentConfig:
+        """Build the generation config for a request."""
+        config = types.GenerateContentConfig(
+            system_instruction=system_message,
+            stop_sequences=stop_sequences,
+        )
+        if response_schema is not None:
+            config.response_mime_type = "application/json"
+            config.response_schema = response_schema
+        model = self.model or ""
+        if any(marker in model for marker in _ALWAYS_THINKING_MODELS):
+            return config
+        if "2.5-flash" in model:
+            config.thinking_config = types.ThinkingConfig(thinking_budget=0)
+        config.max_output_tokens = max_output_tokens
+        return config
+
+    def _resolve_theme(self, theme: str) -> Tuple[str, Dict]:
+        """Look up a theme, falling back to 'medieval' when it does not exist."""
         # Get theme data from ThemeLoader
-        theme_data = self.theme_loader.get_theme(theme.lower())
+        theme_data = self.theme_loader.get_theme(theme)
         if not theme_data:
             print(f"{Fore.YELLOW}⚠️ Theme '{theme}' not found, using 'medieval'{Style.RESET_ALL}")
             theme_data = self.theme_loader.get_theme("medieval")
             theme = "medieval"
+        return theme, theme_data
+
+    def _prepare_request(self, original_text: str, drama_level: int, theme: str) -> Tuple[Dict, str, str]:
+        """Resolve the theme and build the system and user prompts for a request."""
+        theme, theme_data = self._resolve_theme(theme)
+        system_message = self._get_system_message(theme, theme_data, drama_level)
+        contents = _USER_TEMPLATE.format(theme=theme, text=original_text)
+        return theme_data, system_message, contents
+
+    def _prepare_batch_request(self, texts: List[str], drama_level: int, theme: str) -> Tuple[Dict, str, str]:
+        """Build the prompts for transforming several entries in a single request."""
+        theme, theme_data = self._resolve_theme(theme)
+        system_message = self._get_system_message(theme, theme_data, drama_level)
+        numbered = "\n".join(f"{i}. {text}" for i, text in enumerate(texts, 1))
+        contents = _BATCH_USER_TEMPLATE.format(theme=theme, count=len(texts), numbered=numbered)
+        return theme_data, system_message, contents
+
+    @staticmethod
+    def _parse_batch_response(text: str, count: int) -> Optional[List[Tuple[str, str]]]:
+        """Parse a structured batch response into (emoji, epic) pairs, or None if it is unusable."""
+        try:
+            items = _json_loads(text)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(items, list) or len(items) != count:
+            return None
 
-        theme_vocabulary = ", ".join(theme_data["vocabulary"][:8])
-        theme_metaphors = ", ".join(theme_data["metaphors"][:6])
-        drama_instructions = self._get_drama_instructions(drama_level)
+        tales = []
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get("epic"), str) or not item["epic"].strip():
+                return None
+            tales.append((str(item.get("emoji", "")).strip(), item["epic"].strip()))
+        return tales
 
-        system_message = f"""You are a creative storyteller specializing in {theme_data["tone"]} narratives.
+    def _finalize_content(self, text: str, theme_data: Dict, emoji: str = "") -> str:
+        """Clean up a model response and make sure it carries an emoji.
 
-Transform software changes into epic {theme} stories using this vocabulary: {theme_vocabulary}
-Include metaphors like: {theme_metaphors}
-{drama_instructions}
+        emoji is the one the model picked separately (batched responses); it
+        is preferred over the theme's emoji when the text has none.
+        """
+        content = text.strip()
 
-Keep responses to 7-10 words with an appropriate emoji. Be direct and dramatic."""
+        # Add the model's or the theme's emoji if not present
+        emoji = emoji or theme_data.get("emoji", "🎭")
+        if emoji not in content and not _EPIC_EMOJI_RE.search(content):
+            content = f"{emoji} {content}"
+
+        return content
+
+    def _cache_get(self, original_text: str, drama_level: int, theme: str) -> Optional[str]:
+        """Get a cached transformation, or None on a miss or when caching is disabled."""
+        if self._cache is None:
+            return None
+        return self._cache.get(ResponseCache.make_key(self.model, theme.lower(), drama_level, original_text))
+
+    def _cache_set(self, original_text: str, drama_level: int, theme: str, content: str) -> None:
+        """Store a successful transformation in the response cache."""
+        if self._cache is not None:
+            self._cache.set(ResponseCache.make_key(self.model, theme.lower(), drama_level, original_text), content)
+
+    def _cache_get_many(self, texts: List[str], drama_level: int, theme: str) -> List[Optional[str]]:
+        """Get the cached transformation of each text in one lookup, with None for misses."""
+        if self._cache is None:
+            return [None] * len(texts)
+        keys = [ResponseCache.make_key(self.model, theme.lower(), drama_level, text) for text in texts]
+        found = self._cache.get_many(keys)
+        return [found.get(key) for key in keys]
+
+    def _cache_set_many(self, contents: Mapping[str, str], drama_level: int, theme: str) -> None:
+        """Store several successful transformations, keyed by original text, in one transaction."""
+        if self._cache is not None and contents:
+            self._cache.set_many(
+                (ResponseCache.make_key(self.model, theme.lower(), drama_level, text), content)
+                for text, content in contents.items())
+
+    def generate_epic_changelog(self, original_text: str, drama_level: int = 7, theme: str = "medieval") -> str:
+        """Transform a boring changelog entry into an epic narrative."""
+        cached = self._cache_get(original_text, drama_level, theme)
+        if cached is not None:
+            return cached
+
+        theme_data, system_message, contents = self._prepare_request(original_text, drama_level, theme)
 
         try:
             if self.use_api:
-                response = self.client.models.generate_content(
+                stream = self.client.models.generate_content_stream(
                     model=self.model,
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_message,
-                    ),
-                    contents=f"Transform this software change into an epic {theme} tale: '{original_text}'"
+                    config=self._generation_config(system_message, MAX_OUTPUT_TOKENS, ["\n\n"]),
+                    contents=contents
                 )
-                
-                content = response.text.strip()
 
-                # Add theme-specific emoji if not present
-                theme_emoji = theme_data.get("emoji", "🎭")
-                if not any(emoji in content for emoji in ['⚔️', '🏰', '🐉', '🚀', '💥', '⚡', '🎭', '🤖', '🏴‍☠️', '🤠']):
-                    content = f"{theme_emoji} {content}"
+                text = ""
+                for chunk in stream:
+                    text, complete = _add_tale_chunk(text, chunk)
+                    if complete:
+                        break
+                if hasattr(stream, "close"):
+                    stream.close()
 
+                content = self._finalize_content(_truncate_words(text), theme_data)
+                self._cache_set(original_text, drama_level, theme, content)
                 return content
             else:
                 return "😢 Epic transformation unavailable - please check your setup"
 
         except Exception as e:
-            return f"⚠️ Failed to summon the epic transformation: {str(e)}"
+            return f"{FAILURE_PREFIX}: {str(e)}"
 
-    def process_changelog_file(self, filename: str, drama_level: int = 7, theme: str = "medieval") -> List[str]:
-        """Process a file containing multiple changelog entries."""
+    @_with_async_client
+    async def _agenerate_epic_changelog(self, original_text: str, drama_level: int = 7, theme: str = "medieval") -> str:
+        """Async counterpart of generate_epic_changelog using the Gemini async client."""
+        cached = self._cache_get(original_text, drama_level, theme)
+        if cached is not None:
+            return cached
+
+        theme_data, system_message, contents = self._prepare_request(original_text, drama_level, theme)
+
+        async def request() -> str:
+            stream = await self._run_aio().models.generate_content_stream(
+                model=self.model,
+                config=self._generation_config(system_message, MAX_OUTPUT_TOKENS, ["\n\n"]),
+                contents=contents
+            )
+
+            text = ""
+            async for chunk in stream:
+                text, complete = _add_tale_chunk(text, chunk)
+                if complete:
+                    break
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+            return text
+
+        try:
+            if self.use_api:
+                text = await retry_async(request, self._run_limiter())
+                content = self._finalize_content(_truncate_words(text), theme_data)
+                self._cache_set(original_text, drama_level, theme, content)
+                return content
+            else:
+                return "😢 Epic transformation unavailable - please check your setup"
+
+        except Exception as e:
+            return f"{FAILURE_PREFIX}: {str(e)}"
+
+    @_with_async_client
+    async def agenerate_epic_batch(self, texts: List[str], drama_level: int = 7,
+                                   theme: str = "medieval") -> List[str]:
+        """Transform several changelog entries with a single request.
+
+        Cached entries are served from the cache; the rest are sent as one
+        numbered prompt that asks for a JSON array with one {emoji, epic}
+        object per entry. If the response cannot be matched back to every
+        entry, the entries are transformed one by one instead.
+        """
+        results = self._cache_get_many(texts, drama_level, theme)
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if len(pending) == 1:
+            i = pending[0]
+            results[i] = await self._agenerate_epic_changelog(texts[i], drama_level, theme)
+        elif pending:
+            tales = None
+            theme_data, system_message, contents = self._prepare_batch_request(
+                [texts[i] for i in pending], drama_level, theme)
+
+            async def request():
+                return await self._run_aio().models.generate_content(
+                    model=self.model,
+                    config=self._generation_config(system_message, MAX_OUTPUT_TOKENS * len(pending),
+                                                   response_schema=_BATCH_RESPONSE_SCHEMA),
+                    contents=contents
+                )
+
+            try:
+                if self.use_api:
+                    response = await retry_async(request, self._run_limiter())
+                    tales = self._parse_batch_response(response.text, len(pending))
+            except Exception as e:
+                if is_retryable(e):
+                    # Still rate limited after retrying; per-entry requests would only add load
+                    for i in pending:
+                        results[i] = f"{FAILURE_PREFIX}: {str(e)}"
+                    return results
+                tales = None
+
+            if tales is None:
+                fallback = await asyncio.gather(
+                    *(self._agenerate_epic_changelog(texts[i], drama_level, theme) for i in pending))
+                for i, content in zip(pending, fallback):
+                    results[i] = content
+            else:
+                for i, (emoji, epic) in zip(pending, tales):
+                    results[i] = self._finalize_content(_truncate_words(epic), theme_data, emoji)
+                self._cache_set_many({texts[i]: results[i] for i in pending}, drama_level, theme)
+
+        return results
+
+    def generate_epic_batch(self, texts: List[str], drama_level: int = 7, theme: str = "medieval") -> List[str]:
+        """Transform several changelog entries with a single request."""
+        return asyncio.run(self.agenerate_epic_batch(texts, drama_level, theme))
+
+    @_with_async_client
+    async def _atransform_entries(self, entries: List[str], drama_level: int, theme: str) -> List[str]:
+        """Get the epic version of each entry, transforming them concurrently in batches."""
+        # Every API call takes a permit, so the bound on in-flight requests also covers
+        # per-entry fallbacks; it shrinks while Gemini is rate limiting us.
+        # Windows of one file share the limiter of their run.
+        limiter = self._run_limiter() or AdaptiveLimiter(self.max_concurrency)
+
+        # Duplicate entries share a single request, unique ones are packed into batches
+        unique_entries = list(dict.fromkeys(entries))
+        batches = [unique_entries[i:i + self.batch_size] for i in range(0, len(unique_entries), self.batch_size)]
+        limiter_token = _ACTIVE_LIMITER.set((self.api_key, limiter))
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                lines = [line.strip() for line in f.readlines() if line.strip()]
+            batch_results = await asyncio.gather(
+                *(self.agenerate_epic_batch(batch, drama_level, theme) for batch in batches))
+        finally:
+            _ACTIVE_LIMITER.reset(limiter_token)
+        epic_by_entry = dict(zip(unique_entries, (epic for batch in batch_results for epic in batch)))
+        return [epic_by_entry[entry] for entry in entries]
 
-            results = []
-            for line in lines:
-                epic_version = self.generate_epic_changelog(line, drama_level, theme)
-                results.append(f"Original: {line}\nEpic: {epic_version}\n")
+    async def aprocess_entries(self, entries: List[str], drama_level: int = 7, theme: str = "medieval") -> List[str]:
+        """Transform a list of changelog entries concurrently, preserving their order."""
+        epic_versions = await self._atransform_entries(entries, drama_level, theme)
+        return [f"Original: {entry}\nEpic: {epic_version}\n" for entry, epic_version in zip(entries, epic_versions)]
 
-            return results
+    def process_entries(self, entries: List[str], drama_level: int = 7, theme: str = "medieval") -> List[str]:
+        """Transform a list of changelog entries, batching and fanning out requests."""
+        return asyncio.run(self.aprocess_entries(entries, drama_level, theme))
+
+    async def aprocess_changelog_file(self, filename: str, drama_level: int = 7, theme: str = "medieval") -> List[str]:
+        """Process a changelog file, transforming all entries concurrently."""
+        try:
+            # Read the file in a worker thread so the event loop is never blocked on disk I/O
+            loop = asyncio.get_running_loop()
+            lines = await loop.run_in_executor(None, _read_changelog_entries, filename)
+            return await self.aprocess_entries(lines, drama_level, theme)
 
         except FileNotFoundError:
             return [f"⚠️ The sacred scroll '{filename}' could not be found in this realm!"]
         except Exception as e:
-            return [f"⚠️ An unexpected curse befell the file processing: {str(e)}"]
\ No newline at end of file
+            return [f"⚠️ An unexpected curse befell the file processing: {str(e)}"]
+
+    @_with_async_client
+    async def _aschedule_changelog_windows(self, filename: str, drama_level: int, theme: str,
+                                           windows: "asyncio.Queue[Optional[Tuple[List[str], asyncio.Future]]]") -> None:
+        """Read a changelog file window by window, starting each window's transformation as it is read.
+
+        Every window is put on the queue with the task transforming it, then
+        None marks the end of the file (or an error, which this coroutine
+        raises). All windows share one concurrency limiter, and this
+        coroutine returns once every window is done.
+        """
+        loop = asyncio.get_running_loop()
+        limiter_token = _ACTIVE_LIMITER.set((self.api_key, AdaptiveLimiter(self.max_concurrency)))
+        pending = set()
+        error: Optional[Exception] = None
+        try:
+            try:
+                window_iter = _iter_changelog_windows(filename)
+                while True:
+                    # Read in a worker thread so the event loop is never blocked on disk I/O
+                    window = await loop.run_in_executor(None, next, window_iter, None)
+                    if window is None:
+                        break
+                    task = asyncio.ensure_future(self._atransform_entries(window, drama_level, theme))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    await windows.put((window, task))
+            except Exception as e:
+                # Windows already queued still finish: the consumer drains them,
+                # then gets this error when it awaits this coroutine
+                error = e
+            await windows.put(None)
+            if pending:
+                await asyncio.wait(pending)
+        except asyncio.CancelledError:
+            # The consumer has gone away, so nobody will read the remaining windows
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            raise
+        finally:
+            _ACTIVE_LIMITER.reset(limiter_token)
+        if error is not None:
+            raise error
+
+    async def aiter_changelog_file(self, filename: str, drama_level: int = 7,
+                                   theme: str = "medieval") -> AsyncIterator[Tuple[str, str]]:
+        """Yield (original, epic) pairs in file order while the file is transformed.
+
+        The whole file is processed in one run: windows of FILE_WINDOW_SIZE
+        entries are scheduled as they are read, a few windows ahead of the
+        output, so --concurrency requests can be in flight at once. Errors
+        opening the file propagate to the caller.
+        """
+        # Enough windows ahead of the output to keep every permit of the limiter busy
+        lookahead = max(1, -(-self.max_concurrency * self.batch_size // FILE_WINDOW_SIZE))
+        windows: "asyncio.Queue[Optional[Tuple[List[str], asyncio.Future]]]" = asyncio.Queue(maxsize=lookahead)
+        scheduler = asyncio.ensure_future(self._aschedule_changelog_windows(filename, drama_level, theme, windows))
+        try:
+            while True:
+                item = await windows.get()
+                if item is None:
+                    break
+                window, task = item
+                for pair in zip(window, await task):
+                    yield pair
+            await scheduler
+        finally:
+            if not scheduler.done():
+                scheduler.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await scheduler
+
+    def iter_changelog_file(self, filename: str, drama_level: int = 7,
+                            theme: str = "medieval") -> Iterator[Tuple[str, str]]:
+        """Yield (original, epic) pairs while reading a changelog file.
+
+        All windows run on a single event loop, so requests share one
+        client and one concurrency limiter. Output can be consumed before
+        the whole file has been processed.
+        """
+        loop = asyncio.new_event_loop()
+        pairs = self.aiter_changelog_file(filename, drama_level, theme)
+        try:
+            while True:
+                try:
+                    pair = loop.run_until_complete(pairs.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield pair
+        finally:
+            loop.run_until_complete(pairs.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            if hasattr(loop, "shutdown_default_executor"):
+                loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    def process_changelog_file(self, filename: str, drama_level: int = 7, theme: str = "medieval") -> List[str]:
+        """Process a file containing multiple changelog entries."""
+        return asyncio.run(self.aprocess_changelog_file(filename, drama_level, theme))
+
+    def _batch_manifest_path(self, job_name: str) -> Path:
+        """Get the local manifest path for a batch job."""
+        return self.batch_dir / f"{job_name.rsplit('/', 1)[-1]}.json"
+
+    def submit_batch_job(self, filename: str, drama_level: int = 7, theme: str = "medieval") -> str:
+        """Submit every entry of a changelog file to the Gemini Batch API.
+
+        Batch jobs are billed at a discount but may take up to 24 hours.
+        Returns the job name to pass to fetch_batch_job later.
+        """
+        entries = _read_changelog_entries(filename)
+        unique_entries = list(dict.fromkeys(entries))
+        theme, theme_data = self._resolve_theme(theme)
+        system_message = self._get_system_message(theme, theme_data, drama_level)
+
+        generation_config = {"stop_sequences": ["\n\n"]}
+        config = self._generation_config(system_message, MAX_OUTPUT_TOKENS)
+        if config.max_output_tokens is not None:
+            generation_config["max_output_tokens"] = config.max_output_tokens
+        if config.thinking_config is not None:
+            generation_config["thinking_config"] = {"thinking_budget": config.thinking_config.thinking_budget}
+
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", encoding="utf-8", delete=False) as f:
+            requests_path = f.name
+            for i, entry in enumerate(unique_entries):
+                request = {
+                    "system_instruction": {"parts": [{"text": system_message}]},
+                    "contents": [{"role": "user", "parts": [{"text": _USER_TEMPLATE.format(theme=theme, text=entry)}]}],
+                    "generation_config": generation_config,
+                }
+                f.write(json.dumps({"key": f"entry_{i}", "request": request}) + "\n")
+
+        try:
+            uploaded = self.client.files.upload(
+                file=requests_path,
+                config=types.UploadFileConfig(display_name="epiclog-batch", mime_type="jsonl"),
+            )
+            job = self.client.batches.create(
+                model=self.model,
+                src=uploaded.name,
+                config=types.CreateBatchJobConfig(display_name="epiclog"),
+            )
+        finally:
+            os.unlink(requests_path)
+
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {"entries": entries, "theme": theme, "drama_level": drama_level}
+        self._batch_manifest_path(job.name).write_text(json.dumps(manifest), encoding="utf-8")
+        return job.name
+
+    def fetch_batch_job(self, job_name: str) -> Tuple[str, Optional[List[str]], Optional[str], Optional[int]]:
+        """Get the state of a batch job and, once it has finished, its results.
+
+        Returns (state, results, theme, drama_level), where theme and drama
+        level are those the job was submitted with. Until the job has
+        finished, the last three are None.
+        """
+        job = self.client.batches.get(name=job_name)
+        state = job.state.name if job.state else "JOB_STATE_UNSPECIFIED"
+        if state not in _BATCH_DONE_STATES:
+            return state, None, None, None
+
+        manifest = json.loads(self._batch_manifest_path(job_name).read_text(encoding="utf-8"))
+        entries, theme, drama_level = manifest["entries"], manifest["theme"], manifest["drama_level"]
+        unique_entries = list(dict.fromkeys(entries))
+        theme_data = self.theme_loader.get_theme(theme) or self.theme_loader.get_theme("medieval")
+
+        epic_by_entry = {}
+        transformed = {}
+        output = self.client.files.download(file=job.dest.file_name)
+        for line in output.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            entry = unique_entries[int(item["key"].split("_", 1)[1])]
+            try:
+                parts = item["response"]["candidates"][0]["content"]["parts"]
+                text = "".join(part.get("text", "") for part in parts if not part.get("thought"))
+                epic_by_entry[entry] = transformed[entry] = self._finalize_content(_truncate_words(text), theme_data)
+            except (KeyError, IndexError, TypeError):
+                error = item.get("error", {}).get("message", "no response")
+                epic_by_entry[entry] = f"{FAILURE_PREFIX}: {error}"
+        self._cache_set_many(transformed, drama_level, theme)
+
+        missing = f"{FAILURE_PREFIX}: no response"
+        results = [f"Original: {entry}\nEpic: {epic_by_entry.get(entry, missing)}\n" for entry in entries]
+        return state, results, theme, drama_level
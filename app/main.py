@@ -5,56 +5,85 @@ A theatrical changelog generator that transforms mundane updates into epic narra
 
 import os
 import sys
-from typing import Optional
+from typing import List, Optional
 import click
 from dotenv import load_dotenv
 from colorama import init, Fore, Style
-from .epic_log_generator import EpicChangelogAgent
 
 
 # Initialize colorama for Windows terminal colors
 init()
 
-# Load environment variables
+# Load environment variables (the option defaults below read them)
 load_dotenv()
 
-def print_epic_banner():
-    """Print the epic banner."""
-    banner = f"""{Fore.YELLOW}╔════════════════════════════════════════════════════════════╗
+# Write buffer for saving epic transformations
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+_BANNER = f"""{Fore.YELLOW}╔════════════════════════════════════════════════════════════╗
 ║  ⚔️ EPIC LOGGER AGENT (Powered by AI) ⚔️                     ║
 ║  Transforming mundane updates into legendary tales...      ║
 ╚════════════════════════════════════════════════════════════╝
     {Style.RESET_ALL}
+
 """
-    print(banner)
 
-def print_available_themes(agent):
-    """Display available themes to the user."""
-    print(f"\n{Fore.CYAN}🎭 Available Themes:{Style.RESET_ALL}")
-    
-    themes_by_source = agent.get_themes_by_source()
-    
-    # Show default themes
-    if themes_by_source["default"]:
-        print(f"\n  {Fore.GREEN}📦 Default Themes:{Style.RESET_ALL}")
-        for theme_name in themes_by_source["default"]:
-            theme_data = agent.theme_loader.get_theme(theme_name)
-            emoji = theme_data.get("emoji", "🎭")
-            display_name = theme_data.get("display_name", theme_name)
-            description = theme_data.get("description", "")
-            print(f"    {emoji} {Fore.YELLOW}{theme_name}{Style.RESET_ALL}: {description}")
-    
-    # Show custom themes
-    if themes_by_source["custom"]:
-        print(f"\n  {Fore.CYAN}🎨 Custom Themes:{Style.RESET_ALL}")
-        for theme_name in themes_by_source["custom"]:
-            theme_data = agent.theme_loader.get_theme(theme_name)
-            emoji = theme_data.get("emoji", "🎭")
-            display_name = theme_data.get("display_name", theme_name)
-            description = theme_data.get("description", "")
-            print(f"    {emoji} {Fore.YELLOW}{theme_name}{Style.RESET_ALL}: {description}")
+# One line of the --list-themes output, filled in per theme
+_THEME_ROW = f"    {{emoji}} {Fore.YELLOW}{{name}}{Style.RESET_ALL}: {{description}}\n"
+
+def print_epic_banner():
+    """Print the epic banner."""
+    sys.stdout.write(_BANNER)
+
+# Section headers of the --list-themes output, in display order
+_THEME_SECTIONS = (
+    ("default", f"\n  {Fore.GREEN}📦 Default Themes:{Style.RESET_ALL}\n"),
+    ("custom", f"\n  {Fore.CYAN}🎨 Custom Themes:{Style.RESET_ALL}\n"),
+)
+
+def print_available_themes(theme_loader):
+    """Display available themes to the user, writing each section at once."""
+    sys.stdout.write(f"\n{Fore.CYAN}🎭 Available Themes:{Style.RESET_ALL}\n")
+
+    # Sort once and bucket the formatted rows by source
+    rows_by_source = {source: [] for source, _ in _THEME_SECTIONS}
+    for theme_name, theme_data in sorted(theme_loader.get_all_themes().items()):
+        rows = rows_by_source.get(theme_data.get("_source"))
+        if rows is not None:
+            rows.append(_THEME_ROW.format(
+                emoji=theme_data.get("emoji", "🎭"),
+                name=theme_name,
+                description=theme_data.get("description", "")
+            ))
+
+    for source, header in _THEME_SECTIONS:
+        if rows_by_source[source]:
+            sys.stdout.write(header + "".join(rows_by_source[source]))
     
-    print()
+    sys.stdout.write("\n")
+
+def save_results(output: str, results: List[str], theme: str, drama_level: int):
+    """Write epic transformations to a file in a single buffered write.
+
+    The file is written next to the target and then renamed over it, so a
+    crash mid-write never leaves a truncated file behind.
+    """
+    payload = (
+        "# Epic Changelog Transformations\n\n"
+        f"Theme: {theme} | Drama Level: {drama_level}\n\n"
+        + "".join(f"{result}\n" for result in results)
+    )
+    tmp_output = f"{output}.tmp"
+    try:
+        with open(tmp_output, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_output, output)
+    except BaseException:
+        if os.path.exists(tmp_output):
+            os.unlink(tmp_output)
+        raise
 
 def get_dynamic_theme_choices(agent):
     """Get theme choices dynamically from loaded themes."""
@@ -70,75 +99,137 @@ def get_dynamic_theme_choices(agent):
 @click.option('--model', '-m', default=os.getenv('DEFAULT_MODEL'),
               help='Google Generative AI model to use')
 @click.option('--file', '-f', 'input_file', help='Process a file with multiple changelog entries')
+@click.option('--concurrency', '-c', type=click.IntRange(1, 64),
+              help='Maximum concurrent API requests when processing a file [default: 16]')
+@click.option('--async-batch', is_flag=True,
+              help='Submit --file entries as a discounted Gemini batch job (results within 24h)')
+@click.option('--fetch-batch', help='Fetch the results of a batch job submitted with --async-batch')
 @click.option('--output', '-o', help='Save epic changelogs to file')
 @click.option('--interactive', '-i', is_flag=True, help='Interactive mode')
 @click.option('--list-themes', is_flag=True, help='List all available themes and exit')
 @click.option('--create-theme', help='Create a custom theme template with given name')
 @click.option('--add-theme', help='Add a custom theme from JSON file path')
-def main(text: Optional[str], drama_level: int, theme: str, model: str, input_file: Optional[str],
-         output: Optional[str], interactive: bool, list_themes: bool, create_theme: Optional[str], 
-         add_theme: Optional[str]):
+@click.option('--no-cache', is_flag=True, help='Always call the API instead of reusing cached transformations')
+@click.option('--clear-cache', is_flag=True, help='Remove all cached transformations and exit')
+def main(text: Optional[str], drama_level: int, theme: str, model: str, input_file: Optional[str], concurrency: Optional[int],
+         async_batch: bool, fetch_batch: Optional[str], output: Optional[str], interactive: bool, list_themes: bool, create_theme: Optional[str], 
+         add_theme: Optional[str], no_cache: bool, clear_cache: bool):
     """Transform boring changelogs into EPIC narratives! ⚔️"""
 
     print_epic_banner()
 
+    # Cache and theme management commands never touch the API, so they skip
+    # importing google-genai and do not need an API key
+    if clear_cache:
+        from .response_cache import ResponseCache
+        ResponseCache().clear()
+        click.echo(f"{Fore.GREEN}🧹 Cleared cached epic transformations{Style.RESET_ALL}")
+        return
+
+    if list_themes or create_theme or add_theme:
+        from .theme_loader import ThemeLoader
+        theme_loader = ThemeLoader()
+
+        if list_themes:
+            print_available_themes(theme_loader)
+            return
+        
+        if create_theme:
+            success = theme_loader.create_custom_theme_template(create_theme)
+            if success:
+                click.echo(f"{Fore.GREEN}✅ Custom theme template created: {create_theme}_theme.json{Style.RESET_ALL}")
+                click.echo(f"{Fore.CYAN}📝 Edit the template in Themes/Custom_Themes/ directory{Style.RESET_ALL}")
+            return
+        
+        success = theme_loader.add_custom_theme(add_theme, permanent=True)
+        if success:
+            click.echo(f"{Fore.GREEN}✅ Custom theme added successfully!{Style.RESET_ALL}")
+        return
+
+    from .epic_log_generator import EpicChangelogAgent, DEFAULT_MAX_CONCURRENCY, FAILURE_PREFIX
+    from .coalesce import Coalescer
+
     try:
-        agent = EpicChangelogAgent(model=model)
+        agent = EpicChangelogAgent(model=model, max_concurrency=concurrency or DEFAULT_MAX_CONCURRENCY,
+                                   use_cache=not no_cache)
     except ValueError as e:
         click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
         click.echo(f"{Fore.YELLOW}Please set your Google API key in the .env file or GOOGLE_API_KEY environment variable.{Style.RESET_ALL}")
         sys.exit(1)
 
-    # Handle theme management commands
-    if list_themes:
-        print_available_themes(agent)
-        return
-    
-    if create_theme:
-        success = agent.create_custom_theme_template(create_theme)
-        if success:
-            click.echo(f"{Fore.GREEN}✅ Custom theme template created: {create_theme}_theme.json{Style.RESET_ALL}")
-            click.echo(f"{Fore.CYAN}📝 Edit the template in Themes/Custom_Themes/ directory{Style.RESET_ALL}")
-        return
-    
-    if add_theme:
-        success = agent.add_custom_theme(add_theme, permanent=True)
-        if success:
-            click.echo(f"{Fore.GREEN}✅ Custom theme added successfully!{Style.RESET_ALL}")
-        return
-
     # Validate theme
-    available_themes = agent.get_available_themes()
-    if theme not in available_themes:
+    if agent.theme_loader.has_theme(theme):
+        theme = theme.lower()
+    else:
         click.echo(f"{Fore.YELLOW}⚠️ Theme '{theme}' not found. Available themes:{Style.RESET_ALL}")
-        for available_theme in available_themes:
-            theme_data = agent.theme_loader.get_theme(available_theme)
+        for available_theme, theme_data in agent.themes.items():
             emoji = theme_data.get("emoji", "🎭")
             print(f"  {emoji} {available_theme}")
         click.echo(f"{Fore.CYAN}Using default theme 'medieval'{Style.RESET_ALL}")
         theme = "medieval"
 
     results = []
-    
-    if interactive:
+
+    if async_batch:
+        if not input_file:
+            click.echo(f"{Fore.RED}--async-batch requires --file{Style.RESET_ALL}")
+            sys.exit(1)
+        try:
+            job_name = agent.submit_batch_job(input_file, drama_level, theme)
+        except Exception as e:
+            click.echo(f"{Fore.RED}Failed to submit batch job: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+        click.echo(f"{Fore.GREEN}📨 Batch job submitted: {job_name}{Style.RESET_ALL}")
+        click.echo(f"{Fore.CYAN}Fetch the results later with: epiclog --fetch-batch {job_name}{Style.RESET_ALL}")
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                f.write(f"{job_name}\n")
+        return
+
+    if fetch_batch:
+        try:
+            state, results, job_theme, job_drama_level = agent.fetch_batch_job(fetch_batch)
+        except Exception as e:
+            click.echo(f"{Fore.RED}Failed to fetch batch job: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+        if results is None:
+            click.echo(f"{Fore.YELLOW}⏳ Batch job {fetch_batch} is not finished yet ({state}){Style.RESET_ALL}")
+            return
+        # The saved header describes the job's settings, not this command's
+        theme, drama_level = job_theme, job_drama_level
+        for result in results:
+            click.echo(result)
+
+    elif interactive:
         click.echo(f"{Fore.CYAN}🎭 Interactive Epic Changelog Mode{Style.RESET_ALL}")
         click.echo(f"Theme: {theme} | Drama Level: {drama_level}")
         click.echo("Enter changelog entries (empty line to finish):\n")
 
+        # Repeated entries reuse the first successful transformation instead of a new request
+        coalescer = Coalescer(agent.generate_epic_changelog,
+                              is_failure=lambda result: result.startswith(FAILURE_PREFIX))
+
         while True:
             entry = input(f"{Fore.GREEN}> {Style.RESET_ALL}")
             if not entry.strip():
                 break
 
-            epic_version = agent.generate_epic_changelog(entry, drama_level, theme)
+            epic_version = coalescer.get(entry, drama_level, theme)
             click.echo(f"{Fore.BLUE}Epic: {Style.RESET_ALL}{epic_version}\n")
             results.append(f"Original: {entry}\nEpic: {epic_version}\n")
 
     elif input_file:
         click.echo(f"{Fore.CYAN}📜 Processing sacred scroll: {input_file}{Style.RESET_ALL}")
-        results = agent.process_changelog_file(input_file, drama_level, theme)
-        for result in results:
-            click.echo(result)
+        # Results are shown window by window as they come back
+        try:
+            for entry, epic_version in agent.iter_changelog_file(input_file, drama_level, theme):
+                result = f"Original: {entry}\nEpic: {epic_version}\n"
+                click.echo(result)
+                results.append(result)
+        except FileNotFoundError:
+            click.echo(f"⚠️ The sacred scroll '{input_file}' could not be found in this realm!")
+        except Exception as e:
+            click.echo(f"⚠️ An unexpected curse befell the file processing: {str(e)}")
 
     elif text:
         epic_version = agent.generate_epic_changelog(text, drama_level, theme)
@@ -158,11 +249,7 @@ def main(text: Optional[str], drama_level: int, theme: str, model: str, input_fi
     # Save to output file if specified
     if output and results:
         try:
-            with open(output, 'w', encoding='utf-8') as f:
-                f.write("# Epic Changelog Transformations\n\n")
-                f.write(f"Theme: {theme} | Drama Level: {drama_level}\n\n")
-                for result in results:
-                    f.write(result + "\n")
+            save_results(output, results, theme, drama_level)
             click.echo(f"{Fore.GREEN}✨ Epic transformations saved to: {output}{Style.RESET_ALL}")
         except Exception as e:
             click.echo(f"{Fore.RED}Failed to save epic chronicles: {e}{Style.RESET_ALL}")
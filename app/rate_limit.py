@@ -0,0 +1,102 @@
+"""Rate-limit handling for Epic Changelog Agent."""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+from google.genai import errors
+
+# Retry policy for rate-limited and transient server errors
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+# Rate limits reported within this many seconds of a cut belong to the same congestion event
+RATE_LIMIT_COOLDOWN = 1.0
+
+T = TypeVar("T")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Check whether an error is a rate limit (429) or a transient server error (5xx)."""
+    if not isinstance(error, errors.APIError):
+        return False
+    code = error.code or 0
+    return code == 429 or code >= 500
+
+
+class AdaptiveLimiter:
+    """Async concurrency limit that halves on rate limiting and grows back on success."""
+
+    def __init__(self, max_limit: int, increase_after: int = 8, cooldown: float = RATE_LIMIT_COOLDOWN):
+        """Start at max_limit permits; regain one permit per increase_after successes.
+
+        After a cut, further rate limits are ignored for cooldown seconds
+        unless increase_after successes have been recorded since.
+        """
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.increase_after = increase_after
+        self.cooldown = cooldown
+        self._active = 0
+        self._successes = 0
+        self._last_cut: Optional[float] = None
+        self._condition: Optional[asyncio.Condition] = None
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        # Created lazily so the condition binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def record_success(self) -> None:
+        """Additively raise the limit after a run of successful requests."""
+        self._successes += 1
+        if self._successes >= self.increase_after and self.limit < self.max_limit:
+            self.limit += 1
+            self._successes = 0
+
+    def record_rate_limited(self) -> None:
+        """Multiplicatively cut the limit, at most once per congestion event."""
+        now = time.monotonic()
+        if (self._last_cut is not None and now - self._last_cut < self.cooldown
+                and self._successes < self.increase_after):
+            # Another response from the burst that already cut the limit
+            return
+        self.limit = max(1, self.limit // 2)
+        self._successes = 0
+        self._last_cut = now
+
+
+async def retry_async(request: Callable[[], Awaitable[T]], limiter: Optional[AdaptiveLimiter] = None) -> T:
+    """Await request(), retrying rate-limit and server errors with exponential backoff.
+
+    With a limiter, every attempt holds one of its permits while the request
+    is in flight; the backoff sleep between attempts holds none.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            if limiter is None:
+                result = await request()
+            else:
+                async with limiter:
+                    result = await request()
+        except errors.APIError as e:
+            if not is_retryable(e) or attempt == RETRY_ATTEMPTS - 1:
+                raise
+            if limiter is not None and e.code == 429:
+                limiter.record_rate_limited()
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+        else:
+            if limiter is not None:
+                limiter.record_success()
+            return result
@@ -0,0 +1,139 @@
+"""Persistent response cache for Epic Changelog Agent."""
+
+import hashlib
+import os
+import re
+import sqlite3
+import string
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Least recently used responses are evicted beyond this many entries
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Keys looked up per SELECT, below SQLite's limit on bound parameters
+_LOOKUP_CHUNK_SIZE = 500
+
+# Sentence punctuation and quotes stripped from the ends of an entry; symbols
+# such as "+", "-" or "#" can be part of the change itself ("C++", "--force")
+_EDGE_PUNCTUATION = ".,;:!?\"'`" + string.whitespace
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize changelog text so trivially different phrasings share a cache entry.
+
+    Only case, runs of whitespace and punctuation at either end are
+    normalized; punctuation inside the text is kept, so "1.2.3" and "12.3"
+    stay different.
+    """
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip(_EDGE_PUNCTUATION)
+
+
+def default_cache_dir() -> Path:
+    """Get the cache directory, honouring the EPIC_CACHE_DIR environment variable."""
+    cache_dir = os.getenv("EPIC_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+    return Path.home() / ".cache" / "epiclog"
+
+
+class ResponseCache:
+    """Stores generated epic changelogs on disk, keyed by a hash of the request."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Open (or create) the cache database."""
+        self.max_entries = max_entries
+        self._last_tick = 0.0
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "responses.sqlite3"
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, content TEXT NOT NULL, last_used REAL NOT NULL DEFAULT 0)"
+        )
+        try:
+            # Databases created before LRU eviction lack the access-time column
+            self._conn.execute("ALTER TABLE responses ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        # Row count, tracked on writes so stores only count rows when evicting
+        self._count = len(self)
+
+    def _tick(self) -> float:
+        """Get a strictly increasing access time, even on coarse system clocks."""
+        self._last_tick = max(time.time(), self._last_tick + 1e-6)
+        return self._last_tick
+
+    @staticmethod
+    def make_key(model: Optional[str], theme: str, drama_level: int, text: str) -> str:
+        """Build a content-addressed key for a generation request.
+
+        The text is normalized first, so entries differing only in case,
+        whitespace or surrounding punctuation map to the same key.
+        """
+        key_source = f"{model}|{theme}|{drama_level}|{normalize_text(text)}"
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Get the cached responses for several keys at once, omitting misses.
+
+        Hits are looked up with one query per chunk of keys and their access
+        times updated in a single transaction.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, str] = {}
+        for start in range(0, len(keys), _LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + _LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            found.update(self._conn.execute(
+                f"SELECT key, content FROM responses WHERE key IN ({placeholders})", chunk))
+        if found:
+            self._conn.executemany("UPDATE responses SET last_used = ? WHERE key = ?",
+                                   [(self._tick(), key) for key in found])
+            self._conn.commit()
+        return found
+
+    def set(self, key: str, content: str) -> None:
+        """Store a response under the given key, evicting the least recently used beyond max_entries."""
+        self.set_many([(key, content)])
+
+    def set_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Store several (key, content) responses in a single transaction."""
+        # The last content given for a key wins
+        rows: List[Tuple[str, float, str]] = [(content, self._tick(), key) for key, content in dict(items).items()]
+        if not rows:
+            return
+        # Replace existing rows first, so only the inserts below add to the row count
+        self._conn.executemany("UPDATE responses SET content = ?, last_used = ? WHERE key = ?", rows)
+        inserted = self._conn.executemany(
+            "INSERT OR IGNORE INTO responses (content, last_used, key) VALUES (?, ?, ?)", rows)
+        self._count += max(inserted.rowcount, 0)
+        if self._count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            # Other processes may share the database, so recount rather than trust the tally
+            self._count = len(self)
+        self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        self._conn.execute("DELETE FROM responses")
+        self._conn.commit()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
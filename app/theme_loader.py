@@ -1,11 +1,64 @@
 """Theme loading utility for Epic Changelog Agent."""
 
+import os
 import json
+import pickle
 import shutil
-from typing import Dict, List, Optional
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from pathlib import Path
 from colorama import Fore, Style
 
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=4).encode("utf-8")
+
+# Bump when the pickled manifest layout or the loaded theme format changes
+_MANIFEST_VERSION = 2
+_MANIFEST_NAME = ".themes_cache.pkl"
+
+# Upper bound on threads reading theme files in parallel
+_MAX_LOAD_WORKERS = 8
+
+
+def _scan_theme_files(directory: Path) -> List[os.DirEntry]:
+    """List the visible *.json files in a directory, sorted by name."""
+    with os.scandir(directory) as entries:
+        theme_files = [
+            entry for entry in entries
+            if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file()
+        ]
+    return sorted(theme_files, key=lambda entry: entry.name)
+
+
+def _write_load_messages(messages: List[Tuple[str, bool]]) -> None:
+    """Write queued (message, is_warning) pairs in one go; only warnings are shown off a terminal."""
+    show_all = sys.stdout.isatty()
+    text = "".join(f"{message}\n" for message, is_warning in messages if is_warning or show_all)
+    if text:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+def _read_theme_file(theme_file: Path) -> Tuple[Path, Optional[Dict], Optional[Exception]]:
+    """Read and parse one theme file, returning the error instead of raising it."""
+    try:
+        return theme_file, _loads(theme_file.read_bytes()), None
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        return theme_file, None, e
+
+
 class ThemeLoader:
     """Loads and manages themes from JSON files."""
 
@@ -23,62 +76,116 @@ class ThemeLoader:
             self.custom_themes_dir = self.themes_root / "Custom_Themes"
 
         self.themes = {}
-        self.load_themes()
+        self._names_set = frozenset()
+        self.manifest_path = self.themes_root / _MANIFEST_NAME
+        if self._load_manifest(self._themes_signature()):
+            self._refresh_names()
+        else:
+            self.load_themes()
+            self._save_manifest(self._themes_signature())
+
+    def _themes_signature(self) -> Tuple:
+        """Fingerprint the theme directories by their mtimes and theme file stats."""
+        signature = [_MANIFEST_VERSION]
+        for directory in (self.default_themes_dir, self.custom_themes_dir):
+            if not directory.exists():
+                signature.append(None)
+                continue
+            files = []
+            for entry in _scan_theme_files(directory):
+                stat = entry.stat()
+                files.append((entry.name, stat.st_mtime_ns, stat.st_size))
+            signature.append((directory.stat().st_mtime_ns, tuple(files)))
+        return tuple(signature)
+
+    def _load_manifest(self, signature: Tuple) -> bool:
+        """Load themes from the pickled manifest if it matches the current signature."""
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                manifest = pickle.load(f)
+        except Exception:
+            return False
+
+        if not isinstance(manifest, dict) or manifest.get("signature") != signature:
+            return False
+        self.themes = manifest["themes"]
+        return True
+
+    def _save_manifest(self, signature: Tuple) -> None:
+        """Atomically write the loaded themes to the pickled manifest."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.themes_root, prefix=_MANIFEST_NAME, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump({"signature": signature, "themes": self.themes}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.manifest_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # A read-only install just loses the start-up cache
+            pass
 
     def load_themes(self) -> None:
         """Load all theme JSON files from Default_Themes and Custom_Themes directories."""
         themes_loaded = 0
+        # (message, is_warning) pairs, written together once loading is done
+        messages: List[Tuple[str, bool]] = []
 
         # Load default themes (always required)
         if self.default_themes_dir.exists():
-            themes_loaded += self._load_themes_from_directory(self.default_themes_dir, "Default")
+            themes_loaded += self._load_themes_from_directory(self.default_themes_dir, "Default", messages)
         else:
-            print(f"{Fore.YELLOW}⚠️ Default themes directory not found: {self.default_themes_dir}{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}💡 Creating Default_Themes directory...{Style.RESET_ALL}")
+            messages.append((f"{Fore.YELLOW}⚠️ Default themes directory not found: {self.default_themes_dir}{Style.RESET_ALL}", True))
+            messages.append((f"{Fore.CYAN}💡 Creating Default_Themes directory...{Style.RESET_ALL}", False))
             self.default_themes_dir.mkdir(parents=True, exist_ok=True)
 
         # Load custom themes (optional)
         if self.custom_themes_dir.exists():
-            themes_loaded += self._load_themes_from_directory(self.custom_themes_dir, "Custom")
+            themes_loaded += self._load_themes_from_directory(self.custom_themes_dir, "Custom", messages)
         else:
-            print(f"{Fore.CYAN}📁 Custom themes directory not found - creating: {self.custom_themes_dir}{Style.RESET_ALL}")
+            messages.append((f"{Fore.CYAN}📁 Custom themes directory not found - creating: {self.custom_themes_dir}{Style.RESET_ALL}", False))
             self.custom_themes_dir.mkdir(parents=True, exist_ok=True)
-            print(f"{Fore.GREEN}✅ Custom_Themes directory created. Add your custom themes here!{Style.RESET_ALL}")
+            messages.append((f"{Fore.GREEN}✅ Custom_Themes directory created. Add your custom themes here!{Style.RESET_ALL}", False))
         
+        self._refresh_names()
         if themes_loaded == 0:
-            print(f"{Fore.YELLOW}⚠️ No theme files found in any directory{Style.RESET_ALL}")
+            messages.append((f"{Fore.YELLOW}⚠️ No theme files found in any directory{Style.RESET_ALL}", True))
         else:
-            print(f"{Fore.GREEN}🎭 Total themes loaded: {themes_loaded}{Style.RESET_ALL}")
+            messages.append((f"{Fore.GREEN}🎭 Total themes loaded: {themes_loaded}{Style.RESET_ALL}", False))
+        _write_load_messages(messages)
     
-    def _load_themes_from_directory(self, directory: Path, theme_type: str) -> int:
-        """Load themes from a specific directory."""
-        theme_files = list(directory.glob("*.json"))
+    def _load_themes_from_directory(self, directory: Path, theme_type: str, messages: List[Tuple[str, bool]]) -> int:
+        """Load themes from a specific directory, queueing any messages."""
+        theme_files = [Path(entry.path) for entry in _scan_theme_files(directory)]
         loaded_count = 0
         
         if not theme_files:
-            print(f"{Fore.YELLOW}⚠️ No theme files found in {theme_type} themes: {directory}{Style.RESET_ALL}")
+            messages.append((f"{Fore.YELLOW}⚠️ No theme files found in {theme_type} themes: {directory}{Style.RESET_ALL}", True))
             return 0
         
-        for theme_file in theme_files:
-            try:
-                with open(theme_file, 'r', encoding='utf-8') as f:
-                    theme_data = json.load(f)
-
-                # Validate theme structure
-                if self._validate_theme(theme_data):
-                    theme_name = theme_data.get("name", theme_file.stem.replace("_theme", ""))
-                    
-                    # Add theme type information
-                    theme_data["_source"] = theme_type.lower()
-                    theme_data["_file_path"] = str(theme_file)
-                    
-                    self.themes[theme_name] = theme_data
-                    loaded_count += 1
-                else:
-                    print(f"{Fore.YELLOW}⚠️ Invalid theme format in {theme_file.name} ({theme_type}){Style.RESET_ALL}")
+        # Read and parse files in parallel; results are applied in order on this thread
+        with ThreadPoolExecutor(max_workers=min(_MAX_LOAD_WORKERS, len(theme_files))) as executor:
+            parsed_files = list(executor.map(_read_theme_file, theme_files))
+
+        for theme_file, theme_data, error in parsed_files:
+            if error is not None:
+                messages.append((f"{Fore.RED}⚠️ Failed to load {theme_type.lower()} theme {theme_file.name}: {error}{Style.RESET_ALL}", True))
+                continue
 
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                print(f"{Fore.RED}⚠️ Failed to load {theme_type.lower()} theme {theme_file.name}: {e}{Style.RESET_ALL}")
+            # Validate theme structure
+            if self._validate_theme(theme_data):
+                theme_name = theme_data.setdefault("name", theme_file.stem.replace("_theme", ""))
+                
+                # Add theme type information
+                theme_data["_source"] = theme_type.lower()
+                theme_data["_file_path"] = str(theme_file)
+                
+                # Keys are stored lower-case; "name" keeps the original casing
+                self.themes[theme_name.lower()] = theme_data
+                loaded_count += 1
+            else:
+                messages.append((f"{Fore.YELLOW}⚠️ Invalid theme format in {theme_file.name} ({theme_type}){Style.RESET_ALL}", True))
         
         return loaded_count
 
@@ -87,10 +194,24 @@ class ThemeLoader:
         required_fields = ["vocabulary", "metaphors", "tone"]
         return all(field in theme_data for field in required_fields)
 
+    def _refresh_names(self) -> None:
+        """Rebuild the set of theme names used by has_theme."""
+        self._names_set = frozenset(self.themes)
+
+    def has_theme(self, theme_name: str) -> bool:
+        """Check whether a theme exists (case-insensitive)."""
+        return theme_name.lower() in self._names_set
+
     def get_theme(self, theme_name: str) -> Optional[Dict]:
-        """Get a specific theme by name."""
+        """Get a specific theme by name (case-insensitive)."""
+        if theme_name.islower():
+            return self.themes.get(theme_name)
         return self.themes.get(theme_name.lower())
 
+    def get_all_themes(self) -> Mapping[str, Dict]:
+        """Get a read-only view of every loaded theme, keyed by name."""
+        return MappingProxyType(self.themes)
+
     def get_available_themes(self) -> List[str]:
         """Get list of available theme names."""
         return list(self.themes.keys())
@@ -135,14 +256,14 @@ class ThemeLoader:
             permanent: If True, copies the theme to Custom_Themes directory for persistence
         """
         try:
-            with open(theme_file_path, 'r', encoding='utf-8') as f:
-                theme_data = json.load(f)
+            theme_data = _loads(Path(theme_file_path).read_bytes())
 
             if self._validate_theme(theme_data):
-                theme_name = theme_data.get("name", Path(theme_file_path).stem.replace("_theme", ""))
+                theme_name = theme_data.setdefault("name", Path(theme_file_path).stem.replace("_theme", ""))
 
                 # Add to memory
-                self.themes[theme_name] = theme_data
+                self.themes[theme_name.lower()] = theme_data
+                self._refresh_names()
 
                 if permanent:
                     # Copy to Custom_Themes directory for persistence
@@ -186,8 +307,7 @@ class ThemeLoader:
         }
 
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(template, f, indent=4)
+            Path(output_path).write_bytes(_dumps(template))
             print(f"{Fore.GREEN}✅ Theme template created: {output_path}{Style.RESET_ALL}")
             return True
         except Exception as e:
@@ -21,7 +21,7 @@ def read_requirements():
         return [
             "python-dotenv>=1.0.0",
             "google-auth>=2.40.3",
-            "google-genai>=1.31.0",
+            "google-genai>=1.39.0",
             "python-dotenv>=1.0.0", 
             "click>=8.0.0",
             "colorama>=0.4.0",
@@ -53,6 +53,9 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=read_requirements(),
+    extras_require={
+        "fast": ["orjson>=3.9"],
+    },
     entry_points={
         "console_scripts": [
             "epiclog=app.main:main",
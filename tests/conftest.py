@@ -0,0 +1,14 @@
+"""
+Shared pytest fixtures
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _colorama():
+    """Enable colorama once for the whole test session."""
+    from colorama import init, deinit
+    init()
+    yield
+    deinit()
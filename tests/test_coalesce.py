@@ -0,0 +1,41 @@
+"""
+Tests for duplicate request coalescing
+"""
+
+from unittest.mock import Mock
+from app.coalesce import Coalescer
+
+
+class TestCoalescer:
+
+    def test_duplicate_entries_share_one_call(self):
+        """Test that a repeated request reuses the first result."""
+        call_fn = Mock(return_value="⚔️ The version ascends!")
+        coalescer = Coalescer(call_fn)
+
+        assert coalescer.get("Bumped version", 7, "medieval") == "⚔️ The version ascends!"
+        assert coalescer.get("Bumped version", 7, "medieval") == "⚔️ The version ascends!"
+
+        call_fn.assert_called_once_with("Bumped version", 7, "medieval")
+
+    def test_different_settings_are_not_shared(self):
+        """Test that drama level and theme are part of the key."""
+        call_fn = Mock(return_value="epic")
+        coalescer = Coalescer(call_fn)
+
+        coalescer.get("Bumped version", 7, "medieval")
+        coalescer.get("Bumped version", 8, "medieval")
+        coalescer.get("Bumped version", 7, "space")
+
+        assert call_fn.call_count == 3
+
+    def test_failures_are_not_shared(self):
+        """Test that a failed generation is retried on the next identical request."""
+        call_fn = Mock(side_effect=["⚠️ Failed to summon the epic transformation: boom", "epic", "other"])
+        coalescer = Coalescer(call_fn, is_failure=lambda result: result.startswith("⚠️"))
+
+        assert coalescer.get("Bumped version", 7, "medieval").startswith("⚠️")
+        assert coalescer.get("Bumped version", 7, "medieval") == "epic"
+        assert coalescer.get("Bumped version", 7, "medieval") == "epic"
+
+        assert call_fn.call_count == 2
@@ -1,87 +1,531 @@
 """
-Tests for the Epic Changelog Agent (Hugging Face version)
+Tests for the Epic Changelog Agent (Google Gemini version)
 """
 
-from unittest.mock import Mock, patch
+import asyncio
+import itertools
+import json
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 import pytest
+from google import genai
+from google.genai import types
+from app import epic_log_generator
 from app.epic_log_generator import EpicChangelogAgent
 
 
+# Expected-failure paths must not pay for warning capture and rendering
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+EXPECTED_THEMES = ("medieval", "space", "superhero", "mythology")
+THEME_FIELDS = ("vocabulary", "metaphors", "tone")
+THEME_PARAMS = tuple(itertools.product(EXPECTED_THEMES, THEME_FIELDS))
+
+# The real client class, captured before the module fixture replaces it
+_REAL_GENAI_CLIENT = genai.Client
+
+# One Gemini client mock for the whole module; spec_set rejects misspelled client attributes
+_CLIENT_MOCK = MagicMock(spec_set=genai.Client)
+
+# Substrings of the agent's failure messages
+ERR_MARKERS = ("Failed to summon the epic transformation", "API Error")
+NOT_FOUND_MARKER = "could not be found"
+
+
+def _stream(*texts):
+    """Build a fake streamed response yielding the given text chunks."""
+    return iter([SimpleNamespace(text=text) for text in texts])
+
+
+async def _astream(*texts):
+    """Build a fake async streamed response yielding the given text chunks."""
+    for text in texts:
+        yield SimpleNamespace(text=text)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _patch_genai_client():
+    """Hand every agent the shared client mock so no test builds a real client and HTTP session."""
+    epic_log_generator._get_genai_client.cache_clear()
+    with patch.object(epic_log_generator.genai, "Client", return_value=_CLIENT_MOCK):
+        yield
+    epic_log_generator._get_genai_client.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def mock_client():
+    """The shared client mock, with calls and configured results cleared before each test."""
+    _CLIENT_MOCK.reset_mock(return_value=True, side_effect=True)
+    _CLIENT_MOCK.aio.aclose = AsyncMock()
+    return _CLIENT_MOCK
+
+
+class _FakeGeminiHandler(BaseHTTPRequestHandler):
+    """Answers generateContent and streamGenerateContent calls over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.server.request_count += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["contents"][0]["parts"][0]["text"]
+        if re.search(r"Return exactly \d+ items", prompt):
+            entries = re.findall(r"^\d+\. (.*)$", prompt, re.MULTILINE)
+            text = json.dumps([{"emoji": "⚔️", "epic": f"Legend of {entry}"} for entry in entries])
+        else:
+            text = "⚔️ Legend of " + re.search(r"tale: '(.*)'", prompt).group(1)
+        payload = json.dumps({"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]})
+
+        if ":streamGenerateContent" in self.path:
+            data, content_type = f"data: {payload}\r\n\r\n".encode("utf-8"), "text/event-stream"
+        else:
+            data, content_type = payload.encode("utf-8"), "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gemini_server():
+    """A fake Gemini server on localhost that counts the requests it answers."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeGeminiHandler)
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def local_agent(gemini_server, monkeypatch):
+    """An agent whose real Gemini clients talk to the fake Gemini server."""
+    base_url = f"http://127.0.0.1:{gemini_server.server_address[1]}"
+
+    def make_client(api_key, http_options):
+        return _REAL_GENAI_CLIENT(
+            api_key=api_key, http_options=types.HttpOptions(base_url=base_url, timeout=http_options.timeout))
+
+    monkeypatch.setattr(epic_log_generator.genai, "Client", make_client)
+    epic_log_generator._get_genai_client.cache_clear()
+    try:
+        yield EpicChangelogAgent(api_key="test-key", model="gemini-2.0-flash", use_cache=False)
+    finally:
+        epic_log_generator._get_genai_client.cache_clear()
+
+
+@pytest.fixture(scope="module")
+def agent():
+    """One agent shared by the tests that do not change its configuration or client."""
+    return EpicChangelogAgent(api_key="test-key", use_cache=False)
+
+
 class TestEpicChangelogAgent:
     
-    def test_init_with_api_key(self):
+    def test_init_with_api_key(self, agent):
         """Test initialization with API key."""
-        agent = EpicChangelogAgent(api_key="test-key")
         assert agent.api_key == "test-key"
     
-    def test_init_without_api_key_raises_error(self):
-        """Test that missing API key raises ValueError."""
-        with patch.dict('os.environ', {}, clear=True):
-            with pytest.raises(ValueError, match="Hugging Face API key is required"):
-                EpicChangelogAgent()
-    
-    def test_themes_exist(self):
-        """Test that all expected themes are available."""
-        agent = EpicChangelogAgent(api_key="test-key")
-        expected_themes = ["medieval", "space", "superhero", "mythology"]
-        
-        for theme in expected_themes:
-            assert theme in agent.themes
-            assert "vocabulary" in agent.themes[theme]
-            assert "metaphors" in agent.themes[theme]
-            assert "tone" in agent.themes[theme]
+    def test_agents_share_client_per_api_key(self, monkeypatch):
+        """Test that agents with the same API key reuse one Gemini client."""
+        monkeypatch.setattr(epic_log_generator.genai, "Client", lambda **kwargs: Mock())
+        epic_log_generator._get_genai_client.cache_clear()
+        try:
+            first = EpicChangelogAgent(api_key="test-key", use_cache=False)
+            second = EpicChangelogAgent(api_key="test-key", use_cache=False)
+            other = EpicChangelogAgent(api_key="other-key", use_cache=False)
+        finally:
+            # Later tests must get the shared mock again
+            epic_log_generator._get_genai_client.cache_clear()
+
+        assert first.client is second.client
+        assert other.client is not first.client
+
+    def test_nested_run_with_other_api_key_uses_its_own_client(self, monkeypatch):
+        """Test that an agent called inside another agent's run never reuses that run's client."""
+        def new_client(api_key):
+            client = MagicMock()
+            client.aio.aclose = AsyncMock()
+            client.aio.models.generate_content_stream = AsyncMock(
+                side_effect=lambda **kwargs: _astream(f"⚔️ Sent with {api_key}"))
+            return client
+
+        monkeypatch.setattr(epic_log_generator, "_new_genai_client", new_client)
+        first = EpicChangelogAgent(api_key="first-key", use_cache=False)
+        second = EpicChangelogAgent(api_key="second-key", use_cache=False)
+
+        async def run():
+            async with first._async_client_scope():
+                return (await first._agenerate_epic_changelog("Fixed login bug"),
+                        await second._agenerate_epic_changelog("Fixed login bug"))
+
+        assert asyncio.run(run()) == ("⚔️ Sent with first-key", "⚔️ Sent with second-key")
+
+    def test_init_without_api_key_raises_error(self, monkeypatch, tmp_path):
+        """Test that missing API key raises ValueError before any cache is created."""
+        monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+        monkeypatch.setenv("EPIC_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(epic_log_generator, "_ENV_LOADED", True)
+        with pytest.raises(ValueError, match="GOOGLE_API_KEY is required"):
+            EpicChangelogAgent()
+        assert not (tmp_path / "cache").exists()
     
-    @patch('epic_changelog.InferenceClient')
-    def test_generate_epic_changelog_success_chat(self, mock_inference_client):
-        """Test successful changelog generation with chat completion."""
-        # Mock the Hugging Face response structure
-        mock_choice = Mock()
-        mock_choice.message.content = "⚔️ Vanquished the login demon!"
-        
-        mock_response = Mock()
-        mock_response.choices = [mock_choice]
-        
-        mock_inference_client.return_value.chat_completion.return_value = mock_response
-        
-        agent = EpicChangelogAgent(api_key="test-key")
-        result = agent.generate_epic_changelog("Fixed login bug")
-        
-        assert result == "⚔️ Vanquished the login demon!"
-        mock_inference_client.return_value.chat_completion.assert_called_once()
+    @pytest.mark.parametrize("theme,key", THEME_PARAMS)
+    def test_themes_exist(self, agent, theme, key):
+        """Test that each expected theme is available with every prompt field."""
+        assert key in agent.themes[theme]
     
-    @patch('epic_changelog.InferenceClient')
-    def test_generate_epic_changelog_success_text_generation(self, mock_inference_client):
-        """Test successful changelog generation with text generation fallback."""
-        # Mock chat_completion to fail, text_generation to succeed
-        mock_inference_client.return_value.chat_completion.side_effect = Exception("Chat not supported")
-        mock_inference_client.return_value.text_generation.return_value = "⚔️ Vanquished the login demon!"
-        
-        agent = EpicChangelogAgent(api_key="test-key")
-        result = agent.generate_epic_changelog("Fixed login bug")
+    @pytest.mark.parametrize("mode", ["sync", "async"])
+    def test_generate_epic_changelog_success(self, agent, mock_client, mode):
+        """Test successful changelog generation through the sync and async streaming clients."""
+        if mode == "sync":
+            generate_stream = mock_client.models.generate_content_stream
+            generate_stream.return_value = _stream("⚔️ Vanquished ", "the login demon!")
+            result = agent.generate_epic_changelog("Fixed login bug")
+        else:
+            generate_stream = mock_client.aio.models.generate_content_stream = AsyncMock(
+                return_value=_astream("⚔️ Vanquished ", "the login demon!")
+            )
+            result = asyncio.run(agent._agenerate_epic_changelog("Fixed login bug"))
         
         assert result == "⚔️ Vanquished the login demon!"
-        mock_inference_client.return_value.text_generation.assert_called_once()
+        assert agent.client is mock_client
+        generate_stream.assert_called_once()
     
-    @patch('epic_changelog.InferenceClient')
-    def test_generate_epic_changelog_handles_error(self, mock_inference_client):
+    def test_generate_epic_changelog_handles_error(self, agent, mock_client):
         """Test error handling in changelog generation."""
-        mock_inference_client.return_value.chat_completion.side_effect = Exception("API Error")
-        mock_inference_client.return_value.text_generation.side_effect = Exception("API Error")
+        mock_client.models.generate_content_stream.side_effect = Exception("API Error")
         
-        agent = EpicChangelogAgent(api_key="test-key")
         result = agent.generate_epic_changelog("Fixed login bug")
         
-        assert "Failed to summon the epic transformation" in result
-        assert "API Error" in result
+        assert all(marker in result for marker in ERR_MARKERS)
     
-    def test_process_changelog_file_not_found(self):
+    def test_process_changelog_file_not_found(self, agent, monkeypatch):
         """Test handling of non-existent file."""
-        agent = EpicChangelogAgent(api_key="test-key")
+        def missing_file(filename):
+            raise FileNotFoundError(filename)
+
+        # Take the missing-file branch without probing the filesystem
+        monkeypatch.setattr(epic_log_generator, "_read_changelog_entries", missing_file)
         results = agent.process_changelog_file("nonexistent.txt")
         
         assert len(results) == 1
-        assert "could not be found" in results[0]
+        assert NOT_FOUND_MARKER in results[0]
+
+    def test_finalize_content_adds_theme_emoji(self, agent):
+        """Test that responses without a known emoji get the theme emoji."""
+        theme_data = agent.theme_loader.get_theme("space")
+
+        assert agent._finalize_content(" Warped past the login nebula ", theme_data) == \
+            f"{theme_data['emoji']} Warped past the login nebula"
+        assert agent._finalize_content("🏴‍☠️ Plundered the bug", theme_data) == "🏴‍☠️ Plundered the bug"
+
+    def test_generation_config_caps_output_tokens(self, monkeypatch):
+        """Test that short-output limits apply to every model except those that always think."""
+        agent = EpicChangelogAgent(api_key="test-key", model="gemini-2.5-flash", use_cache=False)
+        config = agent._generation_config("system", 48, ["\n\n"])
+        assert config.max_output_tokens == 48
+        assert config.stop_sequences == ["\n\n"]
+        assert config.thinking_config.thinking_budget == 0
+
+        monkeypatch.delenv("DEFAULT_MODEL", raising=False)
+        monkeypatch.setattr(epic_log_generator, "_ENV_LOADED", True)
+        for model in ("gemini-2.0-flash", "gemini-1.5-flash", None):
+            agent = EpicChangelogAgent(api_key="test-key", model=model, use_cache=False)
+            config = agent._generation_config("system", 48)
+            assert config.max_output_tokens == 48
+            assert config.thinking_config is None
+
+        agent = EpicChangelogAgent(api_key="test-key", model="gemini-2.5-pro", use_cache=False)
+        config = agent._generation_config("system", 48)
+        assert config.max_output_tokens is None
+        assert config.thinking_config is None
+
+    def test_system_message_is_memoized(self):
+        """Test that the system prompt is built once per theme and drama level."""
+        agent = EpicChangelogAgent(api_key="test-key", use_cache=False)
+
+        _, first, _ = agent._prepare_request("Fixed login bug", 7, "medieval")
+        _, second, _ = agent._prepare_request("Added dark mode", 7, "medieval")
+        _, other, _ = agent._prepare_request("Added dark mode", 2, "medieval")
+
+        assert first is second
+        assert other != first
+        assert set(agent._system_messages) == {("medieval", 7), ("medieval", 2)}
+
+    def test_process_changelog_file_runs_entries_concurrently(self, mock_client, tmp_path):
+        """Test that file entries go through the async client and keep their order."""
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_text("Fixed login bug\n\nAdded dark mode\n", encoding="utf-8")
+
+        agent = EpicChangelogAgent(api_key="test-key", use_cache=False, batch_size=1)
+        mock_client.aio.models.generate_content_stream = AsyncMock(
+            side_effect=lambda **kwargs: _astream("⚔️ ", kwargs["contents"])
+        )
+
+        results = agent.process_changelog_file(str(scroll))
+
+        assert len(results) == 2
+        assert results[0].startswith("Original: Fixed login bug\nEpic: ⚔️")
+        assert results[1].startswith("Original: Added dark mode\nEpic: ⚔️")
+        assert mock_client.aio.models.generate_content_stream.await_count == 2
+
+    def test_process_changelog_file_deduplicates_entries(self, agent, mock_client, tmp_path):
+        """Test that repeated entries in a file only trigger one request."""
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_text("Bumped version\nBumped version\nBumped version\n", encoding="utf-8")
+
+        mock_client.aio.models.generate_content_stream = AsyncMock(
+            side_effect=lambda **kwargs: _astream("⚔️ The version ascends!")
+        )
+
+        results = agent.process_changelog_file(str(scroll))
+
+        assert len(results) == 3
+        assert mock_client.aio.models.generate_content_stream.await_count == 1
+
+    def test_process_changelog_file_batches_entries(self, agent, mock_client, tmp_path):
+        """Test that several entries are packed into one structured-output request."""
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_text("Fixed login bug\nAdded dark mode\nUpdated docs\n", encoding="utf-8")
+
+        mock_client.aio.models.generate_content = AsyncMock(return_value=SimpleNamespace(text=json.dumps([
+            {"emoji": "⚔️", "epic": "Slew the login dragon"},
+            {"emoji": "🏰", "epic": "Darkness falls upon the castle"},
+            {"emoji": "", "epic": "Scribes rewrote the scrolls"},
+        ])))
+
+        results = agent.process_changelog_file(str(scroll))
+
+        assert mock_client.aio.models.generate_content.await_count == 1
+        config = mock_client.aio.models.generate_content.await_args.kwargs["config"]
+        assert config.response_mime_type == "application/json"
+        assert results == [
+            "Original: Fixed login bug\nEpic: ⚔️ Slew the login dragon\n",
+            "Original: Added dark mode\nEpic: 🏰 Darkness falls upon the castle\n",
+            "Original: Updated docs\nEpic: ⚔️ Scribes rewrote the scrolls\n",
+        ]
+
+    def test_generate_epic_batch_finalizes_tales_like_single_entries(self, agent, mock_client):
+        """Test that batched tales are capped at the word limit and never get a second emoji."""
+        long_epic = " ".join(f"word{i}" for i in range(epic_log_generator.MAX_TALE_WORDS + 5))
+        mock_client.aio.models.generate_content = AsyncMock(return_value=SimpleNamespace(text=json.dumps([
+            {"emoji": "⚔️", "epic": "⚔️ Slew the login dragon"},
+            {"emoji": "🔥", "epic": long_epic},
+        ])))
+
+        results = agent.generate_epic_batch(["Fixed login bug", "Added dark mode"])
+
+        assert results[0] == "⚔️ Slew the login dragon"
+        assert results[1] == "🔥 " + " ".join(long_epic.split()[:epic_log_generator.MAX_TALE_WORDS])
+
+    def test_generate_epic_batch_falls_back_on_unparseable_response(self, agent, mock_client):
+        """Test that a malformed batch response falls back to per-entry requests."""
+        mock_client.aio.models.generate_content = AsyncMock(return_value=SimpleNamespace(text=json.dumps([
+            {"emoji": "⚔️", "epic": "Only one tale came back"},
+        ])))
+        mock_client.aio.models.generate_content_stream = AsyncMock(side_effect=[
+            _astream("⚔️ Slew the login dragon"),
+            _astream("🏰 Darkness falls upon the castle"),
+        ])
+
+        results = agent.generate_epic_batch(["Fixed login bug", "Added dark mode"])
+
+        assert results == ["⚔️ Slew the login dragon", "🏰 Darkness falls upon the castle"]
+        assert mock_client.aio.models.generate_content.await_count == 1
+        assert mock_client.aio.models.generate_content_stream.await_count == 2
+
+    def test_iter_changelog_file_yields_pairs(self, agent, mock_client, tmp_path):
+        """Test that the streaming reader yields one pair per non-empty line, window by window."""
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_text("Fixed login bug\n   \nAdded dark mode\nUpdated docs\n", encoding="utf-8")
+
+        mock_client.aio.models.generate_content_stream = AsyncMock(
+            side_effect=lambda **kwargs: _astream("⚔️ A legend ", "is born!")
+        )
+
+        with patch("app.epic_log_generator.FILE_WINDOW_SIZE", 1):
+            pairs = list(agent.iter_changelog_file(str(scroll)))
+
+        assert pairs == [
+            ("Fixed login bug", "⚔️ A legend is born!"),
+            ("Added dark mode", "⚔️ A legend is born!"),
+            ("Updated docs", "⚔️ A legend is born!"),
+        ]
+        assert mock_client.aio.models.generate_content_stream.await_count == 3
+
+    def test_generate_epic_changelog_uses_cache(self, mock_client, tmp_path):
+        """Test that a repeated request is served from the response cache."""
+        agent = EpicChangelogAgent(api_key="test-key", cache_dir=str(tmp_path))
+        mock_client.models.generate_content_stream.side_effect = \
+            lambda **kwargs: _stream("⚔️ Vanquished the login demon!")
+
+        first = agent.generate_epic_changelog("Fixed login bug")
+        second = agent.generate_epic_changelog("Fixed login bug")
+
+        assert first == second == "⚔️ Vanquished the login demon!"
+        mock_client.models.generate_content_stream.assert_called_once()
+
+        agent.clear_cache()
+        agent.generate_epic_changelog("Fixed login bug")
+        assert mock_client.models.generate_content_stream.call_count == 2
+
+    def test_generate_epic_batch_uses_cache_in_one_lookup(self, mock_client, tmp_path):
+        """Test that batch results are cached and a repeated batch is served by a single lookup."""
+        agent = EpicChangelogAgent(api_key="test-key", cache_dir=str(tmp_path))
+        mock_client.aio.models.generate_content = AsyncMock(return_value=SimpleNamespace(text=json.dumps([
+            {"emoji": "⚔️", "epic": "Slew the login dragon"},
+            {"emoji": "🏰", "epic": "Darkness falls upon the castle"},
+        ])))
+        entries = ["Fixed login bug", "Added dark mode"]
+        first = agent.generate_epic_batch(entries)
+
+        with patch.object(agent._cache, "get_many", wraps=agent._cache.get_many) as get_many:
+            second = agent.generate_epic_batch(entries)
+
+        assert first == second == ["⚔️ Slew the login dragon", "🏰 Darkness falls upon the castle"]
+        assert mock_client.aio.models.generate_content.await_count == 1
+        get_many.assert_called_once()
+
+    def test_generate_epic_changelog_stops_streaming_at_word_limit(self, agent, mock_client):
+        """Test that the stream is abandoned once the tale is long enough."""
+        chunks = [SimpleNamespace(text="⚔️ one two three four five six seven "),
+                  SimpleNamespace(text="eight nine ten eleven twelve thirteen fourteen fifteen sixteen "),
+                  SimpleNamespace(text="never read")]
+        stream = Mock()
+        stream.__iter__ = Mock(return_value=iter(chunks))
+        mock_client.models.generate_content_stream.return_value = stream
+
+        result = agent.generate_epic_changelog("Fixed login bug")
+
+        assert result == "⚔️ one two three four five six seven eight nine ten eleven twelve thirteen fourteen"
+        stream.close.assert_called_once()
+
+    def test_agenerate_epic_changelog_stops_streaming_at_word_limit(self, agent, mock_client):
+        """Test that the async stream is abandoned at the same word limit as the sync one."""
+        read = []
+
+        async def stream():
+            for text in ("⚔️ one two three four five six seven ",
+                         "eight nine ten eleven twelve thirteen fourteen fifteen sixteen ",
+                         "never read"):
+                read.append(text)
+                yield SimpleNamespace(text=text)
+
+        mock_client.aio.models.generate_content_stream = AsyncMock(return_value=stream())
+
+        result = asyncio.run(agent._agenerate_epic_changelog("Fixed login bug"))
+
+        assert result == "⚔️ one two three four five six seven eight nine ten eleven twelve thirteen fourteen"
+        assert len(read) == 2
+
+    def test_batch_job_round_trip(self, mock_client, tmp_path):
+        """Test submitting a file as a batch job and pairing the results with its entries."""
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_text("Fixed login bug\nAdded dark mode\nFixed login bug\n", encoding="utf-8")
+
+        agent = EpicChangelogAgent(api_key="test-key", cache_dir=str(tmp_path / "cache"))
+        submitted = {}
+
+        def upload(file, config):
+            with open(file, encoding="utf-8") as f:
+                submitted["lines"] = [json.loads(line) for line in f]
+            return SimpleNamespace(name="files/requests")
+
+        mock_client.files.upload.side_effect = upload
+        mock_client.batches.create.return_value = SimpleNamespace(name="batches/job123")
+
+        job_name = agent.submit_batch_job(str(scroll), drama_level=9, theme="space")
+
+        assert job_name == "batches/job123"
+        assert [line["key"] for line in submitted["lines"]] == ["entry_0", "entry_1"]
+
+        mock_client.batches.get.return_value = SimpleNamespace(state=SimpleNamespace(name="JOB_STATE_RUNNING"))
+        assert agent.fetch_batch_job(job_name) == ("JOB_STATE_RUNNING", None, None, None)
+
+        output = "\n".join(json.dumps({
+            "key": f"entry_{i}",
+            "response": {"candidates": [{"content": {"parts": [{"text": tale}]}}]},
+        }) for i, tale in enumerate(["⚔️ Slew the login dragon", "🏰 Darkness falls upon the castle"]))
+        mock_client.batches.get.return_value = SimpleNamespace(
+            state=SimpleNamespace(name="JOB_STATE_SUCCEEDED"), dest=SimpleNamespace(file_name="files/results"))
+        mock_client.files.download.return_value = output.encode("utf-8")
+
+        state, results, theme, drama_level = agent.fetch_batch_job(job_name)
+
+        assert state == "JOB_STATE_SUCCEEDED"
+        assert (theme, drama_level) == ("space", 9)
+        assert results == [
+            "Original: Fixed login bug\nEpic: ⚔️ Slew the login dragon\n",
+            "Original: Added dark mode\nEpic: 🏰 Darkness falls upon the castle\n",
+            "Original: Fixed login bug\nEpic: ⚔️ Slew the login dragon\n",
+        ]
+
+
+
+class TestLocalGeminiServer:
+
+    def test_process_changelog_file_twice(self, local_agent, gemini_server, tmp_path):
+        """Test that a second run does not reuse connections from the first run's closed event loop."""
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_text("Fixed login bug\nAdded dark mode\nUpdated docs\n", encoding="utf-8")
+
+        for _ in range(2):
+            results = local_agent.process_changelog_file(str(scroll))
+            assert results == [
+                "Original: Fixed login bug\nEpic: ⚔️ Legend of Fixed login bug\n",
+                "Original: Added dark mode\nEpic: ⚔️ Legend of Added dark mode\n",
+                "Original: Updated docs\nEpic: ⚔️ Legend of Updated docs\n",
+            ]
+
+        # One batch request per run; a failed batch would fall back to three per-entry requests
+        assert gemini_server.request_count == 2
+
+    def test_iter_changelog_file_spans_windows(self, local_agent, gemini_server, tmp_path):
+        """Test that a file larger than one window is transformed on a single event loop."""
+        entries = [f"entry {i}" for i in range(2 * epic_log_generator.FILE_WINDOW_SIZE + 6)]
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_text("\n".join(entries), encoding="utf-8")
+
+        pairs = list(local_agent.iter_changelog_file(str(scroll)))
+
+        assert pairs == [(entry, f"⚔️ Legend of {entry}") for entry in entries]
+        # One request per batch (batches never straddle a window), with no per-entry fallbacks
+        window_sizes = [epic_log_generator.FILE_WINDOW_SIZE] * 2 + [6]
+        assert gemini_server.request_count == sum(-(-size // local_agent.batch_size) for size in window_sizes)
+
+    def test_iter_changelog_file_closed_early(self, local_agent, tmp_path):
+        """Test that abandoning the iterator part-way cancels the remaining windows cleanly."""
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_text("\n".join(f"entry {i}" for i in range(70)), encoding="utf-8")
+
+        pairs = local_agent.iter_changelog_file(str(scroll))
+        assert next(pairs) == ("entry 0", "⚔️ Legend of entry 0")
+        pairs.close()
+
+    def test_iter_changelog_file_read_error_after_first_window(self, local_agent, tmp_path, monkeypatch):
+        """Test that a read error partway through the file surfaces after the windows read before it."""
+        monkeypatch.setattr(epic_log_generator, "FILE_BUFFER_SIZE", 64)
+        entries = [f"entry {i}" for i in range(1000)]
+        scroll = tmp_path / "changelog.txt"
+        scroll.write_bytes("\n".join(entries).encode("utf-8") + b"\n\xff broken\n")
+
+        pairs = []
+        with pytest.raises(UnicodeDecodeError):
+            for pair in local_agent.iter_changelog_file(str(scroll)):
+                pairs.append(pair)
+
+        assert len(pairs) >= epic_log_generator.FILE_WINDOW_SIZE
+        assert pairs == [(entry, f"⚔️ Legend of {entry}") for entry in entries[:len(pairs)]]
 
 
 if __name__ == "__main__":
-    pytest.main([__file__])
+    sys.exit(pytest.main([__file__, "-x", "-p", "no:cacheprovider"]))
@@ -0,0 +1,51 @@
+"""
+Tests for the command-line helpers
+"""
+
+from unittest.mock import patch
+import pytest
+from app.main import print_available_themes, save_results
+from app.theme_loader import ThemeLoader
+
+
+class TestSaveResults:
+
+    def test_writes_all_results(self, tmp_path):
+        """Test that results are saved with the header and no temporary file is left."""
+        output = tmp_path / "epic.md"
+        save_results(str(output), ["Original: a\nEpic: A\n", "Original: b\nEpic: B\n"], "space", 5)
+
+        content = output.read_text(encoding="utf-8")
+        assert content.startswith("# Epic Changelog Transformations\n\nTheme: space | Drama Level: 5\n\n")
+        assert "Epic: A" in content and "Epic: B" in content
+        assert list(tmp_path.iterdir()) == [output]
+
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        """Test that a failure mid-save leaves the existing output untouched."""
+        output = tmp_path / "epic.md"
+        output.write_text("previous chronicles", encoding="utf-8")
+
+        with patch("app.main.os.fsync", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                save_results(str(output), ["Original: a\nEpic: A\n"], "space", 5)
+
+        assert output.read_text(encoding="utf-8") == "previous chronicles"
+        assert list(tmp_path.iterdir()) == [output]
+
+
+def test_print_available_themes_groups_by_source(tmp_path, capsys):
+    """Test that themes are listed sorted, under their default or custom section."""
+    loader = ThemeLoader(str(tmp_path))
+    base = {"vocabulary": ["quest"], "metaphors": ["a saga"], "tone": "grand"}
+    loader.themes = {
+        "zeta": dict(base, _source="default", emoji="⚡", description="Last default"),
+        "alpha": dict(base, _source="default", emoji="🏰", description="First default"),
+        "mine": dict(base, _source="custom", description="Custom one"),
+    }
+    capsys.readouterr()
+
+    print_available_themes(loader)
+    output = capsys.readouterr().out
+
+    assert output.index("Default Themes") < output.index("alpha") < output.index("zeta")
+    assert output.index("zeta") < output.index("Custom Themes") < output.index("mine")
@@ -0,0 +1,102 @@
+"""
+Tests for rate-limit retries and adaptive concurrency
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+import pytest
+from google.genai import errors
+from app.rate_limit import AdaptiveLimiter, is_retryable, retry_async
+
+
+def _api_error(code):
+    """Build a Gemini API error with the given HTTP status code."""
+    error_class = errors.ServerError if code >= 500 else errors.ClientError
+    return error_class(code, {"error": {"code": code, "message": "boom", "status": "ERROR"}})
+
+
+class TestRateLimit:
+
+    def test_is_retryable(self):
+        """Test that only rate limits and server errors are retried."""
+        assert is_retryable(_api_error(429))
+        assert is_retryable(_api_error(503))
+        assert not is_retryable(_api_error(400))
+        assert not is_retryable(ValueError("boom"))
+
+    @patch('app.rate_limit.asyncio.sleep', new_callable=AsyncMock)
+    def test_retry_async_recovers_from_rate_limit(self, mock_sleep):
+        """Test that a rate-limited request is retried and shrinks the limiter."""
+        limiter = AdaptiveLimiter(8)
+        request = AsyncMock(side_effect=[_api_error(429), "⚔️ Victory!"])
+
+        result = asyncio.run(retry_async(request, limiter))
+
+        assert result == "⚔️ Victory!"
+        assert request.await_count == 2
+        assert limiter.limit == 4
+        mock_sleep.assert_awaited_once()
+
+    @patch('app.rate_limit.asyncio.sleep', new_callable=AsyncMock)
+    def test_retry_async_does_not_retry_client_errors(self, mock_sleep):
+        """Test that non-transient errors are raised immediately."""
+        request = AsyncMock(side_effect=_api_error(400))
+
+        with pytest.raises(errors.ClientError):
+            asyncio.run(retry_async(request))
+
+        assert request.await_count == 1
+        mock_sleep.assert_not_awaited()
+
+    def test_retry_async_holds_a_permit_per_request(self):
+        """Test that concurrent requests sharing a limiter never exceed its limit."""
+        limiter = AdaptiveLimiter(2)
+        active = peak = 0
+
+        async def request():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0)
+            active -= 1
+            return "⚔️ Victory!"
+
+        async def run_all():
+            return await asyncio.gather(*(retry_async(request, limiter) for _ in range(6)))
+
+        assert asyncio.run(run_all()) == ["⚔️ Victory!"] * 6
+        assert peak == 2
+
+    @patch('app.rate_limit.asyncio.sleep', new_callable=AsyncMock)
+    def test_concurrent_rate_limits_cut_the_limit_once(self, mock_sleep):
+        """Test that a burst of simultaneous 429s halves the limit only once."""
+        limiter = AdaptiveLimiter(16, increase_after=100)
+        requests = [AsyncMock(side_effect=[_api_error(429), "⚔️ Victory!"]) for _ in range(8)]
+
+        async def run_all():
+            return await asyncio.gather(*(retry_async(request, limiter) for request in requests))
+
+        assert asyncio.run(run_all()) == ["⚔️ Victory!"] * 8
+        assert limiter.limit == 8
+
+    def test_rate_limit_after_cooldown_cuts_again(self):
+        """Test that a rate limit after the cooldown is a new congestion event."""
+        limiter = AdaptiveLimiter(16, cooldown=1.0)
+        with patch('app.rate_limit.time.monotonic', side_effect=[10.0, 10.5, 11.5]):
+            limiter.record_rate_limited()
+            limiter.record_rate_limited()
+            assert limiter.limit == 8
+            limiter.record_rate_limited()
+
+        assert limiter.limit == 4
+
+    def test_limiter_recovers_after_successes(self):
+        """Test additive increase back up to the maximum limit."""
+        limiter = AdaptiveLimiter(4, increase_after=2)
+        limiter.record_rate_limited()
+        assert limiter.limit == 2
+
+        for _ in range(10):
+            limiter.record_success()
+
+        assert limiter.limit == 4
@@ -0,0 +1,87 @@
+"""
+Tests for the persistent response cache
+"""
+
+import pytest
+from app.response_cache import ResponseCache, normalize_text
+
+
+class TestResponseCache:
+
+    def test_set_and_get(self, tmp_path):
+        """Test that stored responses survive reopening the cache."""
+        key = ResponseCache.make_key("gemini-2.5-flash", "medieval", 7, "Fixed login bug")
+        ResponseCache(str(tmp_path)).set(key, "⚔️ Vanquished the login demon!")
+
+        assert ResponseCache(str(tmp_path)).get(key) == "⚔️ Vanquished the login demon!"
+
+    def test_miss_returns_none(self, tmp_path):
+        """Test that an unknown key is a cache miss."""
+        cache = ResponseCache(str(tmp_path))
+        assert cache.get("missing") is None
+
+    def test_key_depends_on_every_field(self):
+        """Test that changing any part of the request changes the key."""
+        base = ResponseCache.make_key("gemini-2.5-flash", "medieval", 7, "Fixed login bug")
+        assert base != ResponseCache.make_key("gemini-2.5-pro", "medieval", 7, "Fixed login bug")
+        assert base != ResponseCache.make_key("gemini-2.5-flash", "space", 7, "Fixed login bug")
+        assert base != ResponseCache.make_key("gemini-2.5-flash", "medieval", 8, "Fixed login bug")
+        assert base != ResponseCache.make_key("gemini-2.5-flash", "medieval", 7, "Fixed logout bug")
+
+    def test_clear(self, tmp_path):
+        """Test that clear empties the cache."""
+        cache = ResponseCache(str(tmp_path))
+        cache.set("key", "value")
+        cache.clear()
+
+        assert len(cache) == 0
+
+    def test_normalize_text(self):
+        """Test that case, whitespace and surrounding punctuation are normalized away."""
+        assert normalize_text("  Fix   login bug. ") == "fix login bug"
+        assert normalize_text('"Dropped C++ support!"') == "dropped c++ support"
+
+    def test_key_ignores_trivial_differences(self):
+        """Test that near-identical phrasings share a cache key."""
+        assert ResponseCache.make_key("m", "medieval", 7, "Fix login bug") == \
+            ResponseCache.make_key("m", "medieval", 7, "fix login bug.")
+
+    @pytest.mark.parametrize("first,second", [
+        ("Bumped version to 1.2.3", "Bumped version to 12.3"),
+        ("Dropped C++ support", "Dropped C support"),
+        ("Removed --force flag", "Removed force flag"),
+    ])
+    def test_key_keeps_punctuation_inside_text(self, first, second):
+        """Test that entries differing in punctuation inside the text do not share a key."""
+        assert ResponseCache.make_key("m", "medieval", 7, first) != \
+            ResponseCache.make_key("m", "medieval", 7, second)
+
+    def test_get_many_and_set_many(self, tmp_path):
+        """Test that several responses are stored and looked up at once, skipping misses."""
+        cache = ResponseCache(str(tmp_path))
+        cache.set_many([("a", "1"), ("b", "2"), ("a", "3")])
+
+        assert cache.get_many(["a", "b", "missing"]) == {"a": "3", "b": "2"}
+        assert len(cache) == 2
+
+    def test_set_many_evicts_beyond_max_entries(self, tmp_path):
+        """Test that a batched store keeps only the most recent max_entries responses."""
+        cache = ResponseCache(str(tmp_path), max_entries=2)
+        cache.set("old", "0")
+        cache.set_many([("a", "1"), ("b", "2")])
+
+        assert len(cache) == 2
+        assert cache.get_many(["old", "a", "b"]) == {"a": "1", "b": "2"}
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the least recently used entry is evicted beyond max_entries."""
+        cache = ResponseCache(str(tmp_path), max_entries=2)
+        cache.set("old", "1")
+        cache.set("newer", "2")
+        cache.get("old")
+        cache.set("newest", "3")
+
+        assert len(cache) == 2
+        assert cache.get("newer") is None
+        assert cache.get("old") == "1"
+        assert cache.get("newest") == "3"
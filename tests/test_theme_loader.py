@@ -1,66 +1,95 @@
-#!/usr/bin/env python3
-"""Test script for the new theme loading system."""
-
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+"""Tests for the theme loading system."""
 
+import json
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import pytest
 from app.theme_loader import ThemeLoader
-from colorama import init
-
-# Initialize colorama
-init()
-
-def test_theme_loader():
-    """Test the theme loading functionality."""
-    print("🧪 Testing Theme Loader System...")
-    print("=" * 50)
-    
-    # Initialize theme loader
-    loader = ThemeLoader()
-    
-    print("\n📊 Theme Loading Results:")
-    print("-" * 30)
-    
-    # Get available themes
-    themes = loader.get_available_themes()
-    print(f"Total themes loaded: {len(themes)}")
-    
-    # Get themes by source
-    themes_by_source = loader.get_themes_by_source()
-    print(f"Default themes: {len(themes_by_source['default'])}")
-    print(f"Custom themes: {len(themes_by_source['custom'])}")
-    
-    print("\n🎭 Available Themes:")
-    print("-" * 30)
-    for theme_name in sorted(themes):
-        theme_data = loader.get_theme(theme_name)
-        source = theme_data.get('_source', 'unknown')
-        emoji = theme_data.get('emoji', '🎭')
-        display_name = theme_data.get('display_name', theme_name)
-        print(f"  {emoji} {theme_name} ({source}) - {display_name}")
-    
-    print("\n📁 Directory Structure:")
-    print("-" * 30)
-    print(f"Default themes dir: {loader.default_themes_dir}")
-    print(f"Custom themes dir: {loader.custom_themes_dir}")
-    print(f"Default dir exists: {loader.default_themes_dir.exists()}")
-    print(f"Custom dir exists: {loader.custom_themes_dir.exists()}")
-    
-    # Test theme retrieval
-    print("\n🔍 Testing Theme Retrieval:")
-    print("-" * 30)
-    test_theme = "medieval"
-    theme_data = loader.get_theme(test_theme)
-    if theme_data:
-        print(f"✅ Successfully retrieved '{test_theme}' theme")
-        print(f"   Vocabulary count: {len(theme_data.get('vocabulary', []))}")
-        print(f"   Metaphors count: {len(theme_data.get('metaphors', []))}")
-        print(f"   Source: {theme_data.get('_source', 'unknown')}")
-    else:
-        print(f"❌ Failed to retrieve '{test_theme}' theme")
-    
-    print("\n✅ Theme Loader Test Complete!")
-
-if __name__ == "__main__":
-    test_theme_loader()
+
+
+EXPECTED_THEMES = ("medieval", "space", "superhero", "mythology")
+
+
+@pytest.fixture(scope="session")
+def loader():
+    """One loader over the project themes, shared by the read-only tests."""
+    return ThemeLoader()
+
+
+def test_theme_directories_exist(loader):
+    """Test that both theme directories exist after loading."""
+    assert loader.default_themes_dir.is_dir()
+    assert loader.custom_themes_dir.is_dir()
+
+
+@pytest.mark.parametrize("theme_name", EXPECTED_THEMES)
+def test_theme_present(loader, theme_name):
+    """Test that each bundled theme is loaded as a default theme."""
+    assert theme_name in loader.get_available_themes()
+    assert theme_name in loader.get_themes_by_source()["default"]
+
+
+@pytest.mark.parametrize("theme_name", EXPECTED_THEMES)
+def test_theme_has_required_fields(loader, theme_name):
+    """Test that each bundled theme has the fields prompts are built from."""
+    theme_data = loader.get_theme(theme_name)
+    assert theme_data["vocabulary"]
+    assert theme_data["metaphors"]
+    assert theme_data["tone"]
+    assert theme_data["_source"] == "default"
+
+
+def test_theme_manifest_cache(tmp_path):
+    """Test that themes are reloaded from the manifest until a theme file changes."""
+    default_dir = tmp_path / "Default_Themes"
+    default_dir.mkdir()
+    source_dir = Path(__file__).parent.parent / "Themes" / "Default_Themes"
+    shutil.copy2(source_dir / "medieval_theme.json", default_dir)
+
+    first = ThemeLoader(str(tmp_path))
+    assert first.manifest_path.exists()
+
+    with patch.object(ThemeLoader, "load_themes") as mock_load:
+        second = ThemeLoader(str(tmp_path))
+        mock_load.assert_not_called()
+    assert second.themes == first.themes
+
+    theme_file = default_dir / "medieval_theme.json"
+    theme_data = json.loads(theme_file.read_text(encoding="utf-8"))
+    theme_data["description"] = "Changed"
+    theme_file.write_text(json.dumps(theme_data), encoding="utf-8")
+
+    third = ThemeLoader(str(tmp_path))
+    assert third.get_theme("medieval")["description"] == "Changed"
+    assert second.has_theme("medieval") and third.has_theme("medieval")
+
+
+def test_theme_names_case_insensitive(tmp_path):
+    """Test that theme keys are stored lower-case while the display casing is kept."""
+    default_dir = tmp_path / "Default_Themes"
+    default_dir.mkdir()
+    source_dir = Path(__file__).parent.parent / "Themes" / "Default_Themes"
+    theme_data = json.loads((source_dir / "medieval_theme.json").read_text(encoding="utf-8"))
+    theme_data["name"] = "Medieval"
+    (default_dir / "medieval_theme.json").write_text(json.dumps(theme_data), encoding="utf-8")
+
+    loader = ThemeLoader(str(tmp_path))
+    assert loader.get_available_themes() == ["medieval"]
+    assert loader.get_theme("MEDIEVAL")["name"] == "Medieval"
+    assert loader.get_theme("medieval") is loader.get_theme("Medieval")
+    assert loader.has_theme("Medieval")
+    assert not loader.has_theme("pirate")
+
+
+def test_load_messages_only_warnings_off_terminal(tmp_path, capsys):
+    """Test that progress messages are dropped when stdout is not a terminal but warnings are kept."""
+    default_dir = tmp_path / "Default_Themes"
+    default_dir.mkdir()
+    (default_dir / "broken_theme.json").write_text("{not json", encoding="utf-8")
+
+    ThemeLoader(str(tmp_path))
+    output = capsys.readouterr().out
+    assert "Failed to load default theme broken_theme.json" in output
+    assert "Custom_Themes directory created" not in output
+